@@ -1,9 +1,49 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from typing import Optional, Dict, Any
+from plotly.colors import qualitative
+import numpy as np
+from typing import Optional, Dict, Any, Tuple
 from pathlib import Path
 import base64
+import time
+import uuid
+from datetime import date
+from urllib.parse import urlencode
+
+from backtest import RETURNS_LABEL, load_returns, summarize_windows, window_paths
+from census import PERCENTILES, census_header, census_rows, project_census, project_census_tax, read_census, summarize
+from contributions import ContributionRules, contribution_paths, parse_match_formula
+from decumulation import (
+    DEFAULT_PATHS,
+    TARGET_SUCCESS,
+    deterministic_growth,
+    depletion_index,
+    drawdown_paths,
+    simulate_growth,
+    solve_withdrawal_rate,
+    withdrawal_schedule,
+)
+from export import EXPORT_MIME, SCHEDULE_HEADER, export_file, schedule_rows
+import memory
+import metrics
+import permalink
+from projection import (
+    COMPOUNDING_FREQUENCIES,
+    PAY_FREQUENCIES,
+    PaySchedule,
+    parse_model_list,
+    project_matrix,
+)
+import assumptions
+import projection_cache
+from projection_cache import persistent_cache, tag
+from report import REPORT_MIME, ReportPool, report_key, report_version
+from speculate import Speculator
+from taxes import FILING_STATUSES, after_tax_value, roth_contributions
+import warmup
+
+SCRIPT_STARTED = time.perf_counter()
 
 st.set_page_config(
     page_title="Internal Retire Calc",
@@ -11,6 +51,7 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="collapsed",
 )
+warmup.session_started(st.session_state)
 
 st.markdown(
     """
@@ -125,23 +166,38 @@ ACCENT_HOVER = "#E5620F"
 ACCENT_SOFT = "rgba(249, 113, 19, 0.10)"
 
 with_color = ACCENT
+
+MODEL_COLORS = qualitative.Plotly
+
+BACKTEST_COLORS = {
+    "Best": "#059669",
+    "Median": "#6B7280",
+    "Worst": "#DC2626",
+}
 plot_template = "plotly_white"
 
 def _b64_file(path: Path) -> str:
     return base64.b64encode(path.read_bytes()).decode("utf-8")
 
-def inject_brand_fonts():
+@st.cache_resource(show_spinner=False)
+def load_brand_fonts():
     font_dir = Path(__file__).resolve().parent / "Fonts"
 
     body_font_path = font_dir / "Urbanist-VariableFont_wght.ttf"
     headline_font_path = font_dir / "RethinkSans-VariableFont_wght.ttf"
 
     if not body_font_path.exists() or not headline_font_path.exists():
+        return None
+
+    return _b64_file(body_font_path), _b64_file(headline_font_path)
+
+def inject_brand_fonts():
+    fonts = load_brand_fonts()
+    if fonts is None:
         st.warning("Font files not found in ./Fonts. Check folder name and filenames.")
         return
 
-    body_b64 = _b64_file(body_font_path)
-    headline_b64 = _b64_file(headline_font_path)
+    body_b64, headline_b64 = fonts
 
     st.markdown(
         f"""
@@ -268,161 +324,876 @@ def parse_number(x: str) -> Optional[float]:
 def pct_from_decimal(x: float) -> str:
     return f"{x*100:.2f}%"
 
-MODEL_OPTIONS = {
-    "Core": 0.0878,
-    "Balanced Growth": 0.0988,
-    "Growth": 0.1068,
-    "Aggressive": 0.1176,
+def signed_dollars(x: float) -> str:
+    return f"{'-' if x < 0 else '+'}${abs(x):,.0f}"
+
+CURRENT_YEAR = date.today().year
+
+# Re-read every run; picks up edits to Data/assumptions.json without a redeploy.
+ASSUMPTIONS = assumptions.current()
+MODEL_OPTIONS = ASSUMPTIONS.model_options
+
+ALL_MODELS = "All Models"
+
+# The cfg entries a projection depends on; cache keys ignore the rest.
+PROJECTION_CFG_KEYS = (
+    "target_age",
+    "salary_growth_rate_pct",
+    "employee_contrib_rate_pct",
+    "employer_contrib_rate_pct",
+    "match_formula",
+    "apply_irs_limits",
+    "pay_frequency",
+    "compounding_frequency",
+    "contribution_timing",
+)
+
+CONTRIBUTION_TIMINGS = {
+    "End of period": "end",
+    "Start of period": "start",
 }
+ANNOTATION_MAX_MODELS = 10
+
+# Everything in cfg that changes what chart_panel computes.
+SCENARIO_CFG_KEYS = PROJECTION_CFG_KEYS + (
+    "model_selection",
+    "drawdown",
+    "withdrawal_rate_pct",
+    "inflation_rate_pct",
+    "return_volatility_pct",
+    "plan_to_age",
+    "tax_comparison",
+    "filing_status",
+)
+# What a permalink carries besides age, salary and balance; only the entries
+# that differ from DEFAULT_CFG are encoded.
+PERMALINK_CFG_KEYS = SCENARIO_CFG_KEYS + ("custom_models", "backtest")
+# Linked numbers are clamped to the ranges their widgets accept.
+PERMALINK_RANGES = {
+    "target_age": (1, 100),
+    "salary_growth_rate_pct": (0.0, 50.0),
+    "employee_contrib_rate_pct": (0.0, 50.0),
+    "employer_contrib_rate_pct": (0.0, 50.0),
+    "withdrawal_rate_pct": (0.0, 20.0),
+    "inflation_rate_pct": (0.0, 10.0),
+    "plan_to_age": (50, 120),
+    "return_volatility_pct": (0.0, 50.0),
+}
+# Follow-up tweaks precomputed after each Calculate.
+SPECULATIVE_AGE_STEP = 1
+SPECULATIVE_CONTRIB_STEP_PCT = 1.0
+
+REPORT_TITLE = "Projected 401(k) Balance"
+REPORT_FORMATS = {
+    "pdf": "report (PDF)",
+    "png": "chart (PNG)",
+}
+
+INDIVIDUAL_MODE = "Individual"
+CENSUS_MODE = "Plan census"
+
+def contribution_rules(cfg: Dict[str, Any]) -> ContributionRules:
+    return ContributionRules(
+        employee_rate=float(cfg["employee_contrib_rate_pct"]) / 100.0,
+        employer_rate=float(cfg["employer_contrib_rate_pct"]) / 100.0,
+        match_tiers=parse_match_formula(cfg.get("match_formula", "")),
+        apply_limits=bool(cfg.get("apply_irs_limits", True)),
+    )
 
-MODEL_DROPDOWN_OPTIONS = list(MODEL_OPTIONS.keys()) + ["All Models"]
+def projection_cfg(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: cfg[k] for k in PROJECTION_CFG_KEYS}
+
+def pay_schedule(cfg: Dict[str, Any]) -> PaySchedule:
+    return PaySchedule(
+        pay_periods=PAY_FREQUENCIES[cfg["pay_frequency"]],
+        compounding_periods=COMPOUNDING_FREQUENCIES[cfg["compounding_frequency"]],
+        timing=CONTRIBUTION_TIMINGS[cfg["contribution_timing"]],
+    )
+
+def model_options(cfg: Dict[str, Any]) -> Dict[str, float]:
+    return {**MODEL_OPTIONS, **parse_model_list(cfg.get("custom_models", ""))}
 
 @st.cache_data(show_spinner=False)
-def compute_projection_one_line(
+@persistent_cache(
+    "compute_projection_matrix",
+    depends=(contribution_rules, pay_schedule, CONTRIBUTION_TIMINGS),
+    tags=lambda age, salary, balance, cfg, model_returns, start_year: [tag("return", r) for r in model_returns],
+)
+def compute_projection_matrix(
     age: int,
     salary: float,
     balance: float,
     cfg: Dict[str, Any],
-    model_return: float
-) -> pd.DataFrame:
+    model_returns: Tuple[float, ...],
+    start_year: int,
+) -> np.ndarray:
+    # One row per model; column t is the balance at age + t.
     target_age = int(cfg["target_age"])
 
     end_age = target_age + 1
-    periods_per_year = 24
 
     if age >= end_age or salary <= 0:
-        return pd.DataFrame({"age": [age], "value": [balance]})
+        return np.full((len(model_returns), 1), float(balance))
 
     years = end_age - age
 
     salary_growth = float(cfg["salary_growth_rate_pct"]) / 100.0
-    employee_rate = float(cfg["employee_contrib_rate_pct"]) / 100.0
-    employer_rate = float(cfg["employer_contrib_rate_pct"]) / 100.0
-    annual_contrib_rate = employee_rate + employer_rate
 
-    r_period = (1.0 + float(model_return)) ** (1.0 / periods_per_year) - 1.0
+    _, employee, employer = contribution_paths(age, salary, years, salary_growth, contribution_rules(cfg), start_year)
+    return project_matrix(balance, employee + employer, model_returns, pay_schedule(cfg))
+
+def projection_args(age: int, salary: float, balance: float, cfg: Dict[str, Any], models: Dict[str, float]) -> tuple:
+    # compute_projection_matrix's arguments for the models the chart shows.
+    selected = cfg["model_selection"]
+    returns = tuple(models.values()) if selected == ALL_MODELS else (float(models[selected]),)
+    return age, salary, balance, projection_cfg(cfg), returns, CURRENT_YEAR
+
+def scenario_projection(age: int, salary: float, balance: float, cfg: Dict[str, Any], models: Dict[str, float]) -> np.ndarray:
+    # A permalink opened from the cache supplies the chart's projection as is,
+    # for as long as the scenario on screen is the linked one.
+    args = projection_args(age, salary, balance, cfg, models)
+    opened = st.session_state.get("permalink_projection")
+    if opened is not None:
+        key, values = opened
+        if key == compute_projection_matrix.key(*args):
+            return values
+        del st.session_state["permalink_projection"]
+    return compute_projection_matrix(*args)
 
-    total = float(balance)
-    ages = [age]
-    vals = [total]
+@st.cache_data(show_spinner=False)
+@persistent_cache(
+    "compute_tax_comparison",
+    depends=(compute_projection_matrix, contribution_rules, pay_schedule, CONTRIBUTION_TIMINGS),
+    tags=lambda age, salary, balance, cfg, model_returns, start_year, withdrawal_rate, filing_status: [
+        tag("return", r) for r in model_returns
+    ],
+)
+def compute_tax_comparison(
+    age: int,
+    salary: float,
+    balance: float,
+    cfg: Dict[str, Any],
+    model_returns: Tuple[float, ...],
+    start_year: int,
+    withdrawal_rate: float,
+    filing_status: str,
+) -> np.ndarray:
+    # After-tax value at each age, shape (2, models, years + 1): row 0 defers
+    # pre-tax, row 1 makes the employee deferrals Roth at equal take-home pay.
+    # Employer money and the current balance are pre-tax either way.
+    values = compute_projection_matrix(age, salary, balance, cfg, model_returns, start_year)
+    years = values.shape[1] - 1
+    calendar_years = start_year + np.arange(years + 1)
+    pretax = after_tax_value(values, withdrawal_rate, calendar_years, filing_status)
+    if years == 0:
+        return np.stack([pretax, pretax])
+
+    salaries, employee, employer = contribution_paths(
+        age, salary, years, float(cfg["salary_growth_rate_pct"]) / 100.0, contribution_rules(cfg), start_year
+    )
+    schedule = pay_schedule(cfg)
+    roth = project_matrix(0.0, roth_contributions(salaries, employee, calendar_years[:-1], filing_status), model_returns, schedule)
+    employer_only = project_matrix(balance, employer, model_returns, schedule)
+    return np.stack([pretax, after_tax_value(employer_only, withdrawal_rate, calendar_years, filing_status) + roth])
 
-    for yr in range(1, years + 1):
-        current_salary = salary * ((1.0 + salary_growth) ** (yr - 1))
-        annual_contrib_amount = current_salary * annual_contrib_rate
-        per_period_contrib = annual_contrib_amount / periods_per_year
+@st.cache_data(show_spinner=False)
+def load_backtest_returns() -> Tuple[np.ndarray, np.ndarray]:
+    return load_returns()
 
-        for _ in range(periods_per_year):
-            total *= (1.0 + r_period)
-            total += per_period_contrib
+@st.cache_data(show_spinner=False)
+def compute_backtest(
+    age: int,
+    salary: float,
+    balance: float,
+    cfg: Dict[str, Any],
+    start_year: int,
+) -> Tuple[int, Dict[str, Tuple[int, np.ndarray]]]:
+    years = max(int(cfg["target_age"]) + 1 - age, 0)
+    _, employee, employer = contribution_paths(
+        age, salary, years, float(cfg["salary_growth_rate_pct"]) / 100.0, contribution_rules(cfg), start_year
+    )
 
-        ages.append(age + yr)
-        vals.append(total)
+    start_years, returns = load_backtest_returns()
+    paths = window_paths(balance, employee + employer, returns, pay_schedule(cfg))
+    return len(paths), summarize_windows(start_years, paths)
 
-    return pd.DataFrame({"age": ages, "value": vals})
+@st.cache_data(show_spinner=False)
+def compute_drawdown(
+    retirement_balances: Tuple[float, ...],
+    model_returns: Tuple[float, ...],
+    years: int,
+    withdrawal_rate: float,
+    inflation: float,
+    volatility: float,
+) -> Dict[str, Any]:
+    balances = np.asarray(retirement_balances)
+    withdrawals = np.outer(balances * withdrawal_rate, withdrawal_schedule(1.0, years, inflation))
+    paths = drawdown_paths(balances, withdrawals, deterministic_growth(model_returns, years))
+
+    rates = []
+    band = None
+    for i, model_return in enumerate(model_returns):
+        growth = simulate_growth(model_return, volatility, years)
+        rates.append(solve_withdrawal_rate(inflation, growth)[0])
+        if len(model_returns) == 1:
+            simulated = drawdown_paths(balances[i], withdrawals[i:i + 1], growth)
+            band = np.percentile(simulated, (10, 50, 90), axis=0)
+
+    # Paths and band are only drawn, so float32 is plenty.
+    return {
+        "paths": paths.astype(np.float32),
+        "depletion": depletion_index(paths),
+        "rates": rates,
+        "band": None if band is None else band.astype(np.float32),
+    }
 
+def retirement_income_inputs(cfg: Dict[str, Any]) -> None:
+    with st.expander("Retirement income", expanded=False):
+        cfg["drawdown"] = st.checkbox("Show retirement drawdown", value=bool(cfg["drawdown"]))
+        cfg["withdrawal_rate_pct"] = st.number_input("Initial withdrawal rate (%)", 0.0, 20.0, float(cfg["withdrawal_rate_pct"]), step=0.1)
+        cfg["inflation_rate_pct"] = st.number_input("Withdrawal inflation (%)", 0.0, 10.0, float(cfg["inflation_rate_pct"]), step=0.1)
+        cfg["plan_to_age"] = st.number_input("Plan to age", 50, 120, int(cfg["plan_to_age"]), step=1)
+        cfg["return_volatility_pct"] = st.number_input(
+            "Return volatility (%)", 0.0, 50.0, float(cfg["return_volatility_pct"]), step=0.5,
+            help=f"Used for the {DEFAULT_PATHS:,} simulated return paths behind the sustainable withdrawal rate.",
+        )
 
-st.session_state.setdefault("age_used", 42)
-st.session_state.setdefault("salary_used", 84000.0)
-st.session_state.setdefault("balance_used", 76500.0)
-st.session_state.setdefault("cfg", {})
-cfg = st.session_state.cfg
+def tax_inputs(cfg: Dict[str, Any]) -> None:
+    with st.expander("Taxes", expanded=False):
+        cfg["tax_comparison"] = st.checkbox(
+            "Compare pre-tax and Roth deferrals after federal income tax",
+            value=bool(cfg["tax_comparison"]),
+            help=(
+                "Roth deferrals are sized to leave take-home pay unchanged. Withdrawals are taxed at the "
+                "initial withdrawal rate under Retirement income, on brackets indexed from the bundled table."
+            ),
+        )
+        cfg["filing_status"] = st.selectbox(
+            "Filing status",
+            list(FILING_STATUSES),
+            index=list(FILING_STATUSES).index(cfg["filing_status"]),
+        )
 
-cfg.setdefault("target_age", 65)
-cfg.setdefault("salary_growth_rate_pct", 3.0)
-cfg.setdefault("employee_contrib_rate_pct", 7.8)
-cfg.setdefault("employer_contrib_rate_pct", 4.6)
-cfg.setdefault("model_selection", "Core")
+def assumption_inputs(cfg: Dict[str, Any]) -> None:
+    with st.expander("Assumptions", expanded=False):
+        cfg["salary_growth_rate_pct"] = st.number_input("Annual salary growth (%)", 0.0, 50.0, float(cfg["salary_growth_rate_pct"]), step=0.01)
+        cfg["employee_contrib_rate_pct"] = st.number_input("Employee contribution rate (%)", 0.0, 50.0, float(cfg["employee_contrib_rate_pct"]), step=0.01)
+        cfg["employer_contrib_rate_pct"] = st.number_input(
+            "Employer contribution rate (%)", 0.0, 50.0, float(cfg["employer_contrib_rate_pct"]), step=0.01,
+            help="Flat employer contribution, paid on top of any match.",
+        )
+        cfg["match_formula"] = st.text_input(
+            "Employer match formula",
+            cfg["match_formula"],
+            placeholder="100% of first 3%, 50% of next 2%",
+        )
+        cfg["pay_frequency"] = st.selectbox(
+            "Pay frequency",
+            list(PAY_FREQUENCIES),
+            index=list(PAY_FREQUENCIES).index(cfg["pay_frequency"]),
+        )
+        cfg["compounding_frequency"] = st.selectbox(
+            "Compounding frequency",
+            list(COMPOUNDING_FREQUENCIES),
+            index=list(COMPOUNDING_FREQUENCIES).index(cfg["compounding_frequency"]),
+        )
+        cfg["contribution_timing"] = st.radio(
+            "Contributions credited",
+            list(CONTRIBUTION_TIMINGS),
+            index=list(CONTRIBUTION_TIMINGS).index(cfg["contribution_timing"]),
+            horizontal=True,
+        )
+        cfg["apply_irs_limits"] = st.checkbox(
+            "Apply IRS limits (402(g), 415(c), age 50+ catch-up, compensation cap)",
+            value=bool(cfg["apply_irs_limits"]),
+        )
 
-if cfg.get("model_selection") not in MODEL_DROPDOWN_OPTIONS:
-    cfg["model_selection"] = "Core"
+@st.cache_data(show_spinner=False)
+def load_census(data: bytes, filename: str, default_retirement_age: int) -> pd.DataFrame:
+    return read_census(data, filename, default_retirement_age)
 
-st.title("Internal Retire Calc")
+@st.cache_data(show_spinner=False)
+def compute_census_projection(
+    census: pd.DataFrame,
+    salary_growth: float,
+    rules: ContributionRules,
+    model_returns: Tuple[float, ...],
+    start_year: int,
+    schedule: PaySchedule,
+) -> np.ndarray:
+    return project_census(
+        census["age"].to_numpy(),
+        census["salary"].to_numpy(),
+        census["balance"].to_numpy(),
+        census["retirement_age"].to_numpy(),
+        salary_growth,
+        rules,
+        model_returns,
+        start_year,
+        schedule,
+    )
 
-left, right = st.columns([1, 2])
+@st.cache_data(show_spinner=False)
+def compute_census_tax(
+    census: pd.DataFrame,
+    salary_growth: float,
+    rules: ContributionRules,
+    model_returns: Tuple[float, ...],
+    start_year: int,
+    schedule: PaySchedule,
+    withdrawal_rate: float,
+    filing_status: str,
+) -> np.ndarray:
+    return project_census_tax(
+        census["age"].to_numpy(),
+        census["salary"].to_numpy(),
+        census["balance"].to_numpy(),
+        census["retirement_age"].to_numpy(),
+        salary_growth,
+        rules,
+        model_returns,
+        start_year,
+        withdrawal_rate,
+        filing_status,
+        schedule,
+    )
 
-with left:
-    st.subheader("Inputs")
+def render_census(cfg: Dict[str, Any], models: Dict[str, float]) -> None:
+    left, right = st.columns([1, 2])
 
-    age_input = st.number_input("Current age", 18, 100, int(st.session_state.age_used))
-    target_age_input = st.number_input(
-        "Retirement age",
-        min_value=max(1, int(age_input) + 1),
-        max_value=100,
-        value=int(cfg["target_age"]),
-        step=1,
+    with left:
+        st.subheader("Census")
+        upload = st.file_uploader("Employee census (CSV or XLSX)", type=["csv", "xlsx"])
+        cfg["census_retirement_age"] = st.number_input(
+            "Default retirement age", 1, 100, int(cfg["census_retirement_age"]), step=1
+        )
+        assumption_inputs(cfg)
+        tax_inputs(cfg)
+        if cfg["tax_comparison"]:
+            cfg["withdrawal_rate_pct"] = st.number_input(
+                "Initial withdrawal rate (%)", 0.0, 20.0, float(cfg["withdrawal_rate_pct"]), step=0.1
+            )
+        st.caption(
+            "Needs Age, Salary and Balance columns. "
+            "A Retirement Age column overrides the default per participant."
+        )
+
+    with right:
+        st.subheader("Plan-Level Projection")
+
+        if upload is None:
+            st.info("Upload a census to project every participant under each model.")
+            return
+
+        try:
+            census = load_census(upload.getvalue(), upload.name, int(cfg["census_retirement_age"]))
+        except ValueError as e:
+            st.error(str(e))
+            return
+
+        names = list(models.keys())
+        finals = compute_census_projection(
+            census,
+            float(cfg["salary_growth_rate_pct"]) / 100.0,
+            contribution_rules(cfg),
+            tuple(models.values()),
+            CURRENT_YEAR,
+            pay_schedule(cfg),
+        )
+        summary = summarize(finals, census["balance"].to_numpy(), names)
+
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Participants", f"{len(census):,}")
+        c2.metric("Current plan assets", f"${census['balance'].sum():,.0f}")
+        c3.metric("Skipped rows", f"{census.attrs.get('skipped_rows', 0):,}")
+
+        fig = go.Figure()
+        for p in PERCENTILES:
+            fig.add_trace(go.Bar(x=names, y=summary[f"P{p}"], name=f"P{p}"))
+
+        fig.update_layout(
+            height=400,
+            barmode="group",
+            margin=dict(l=24, r=16, t=20, b=40),
+            plot_bgcolor=plot_bg,
+            paper_bgcolor=paper_bg,
+            template=plot_template,
+            font=dict(family="Urbanist", color=axis_color),
+            yaxis=dict(
+                title=dict(text="Projected Balance at Retirement ($)", font=dict(color=axis_color, size=13, family="Urbanist")),
+                gridcolor=grid_color,
+                fixedrange=True,
+            ),
+            xaxis=dict(fixedrange=True),
+            legend=dict(orientation="h", y=-0.15),
+        )
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+
+        money_cols = ["Current Total", "Projected Total", "Projected Mean"] + [f"P{p}" for p in PERCENTILES]
+        st.dataframe(
+            summary.style.format({c: "${:,.0f}" for c in money_cols} | {"Participants": "{:,}"}),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+        header = census_header(names)
+        columns = finals
+        if cfg["tax_comparison"]:
+            after_tax = compute_census_tax(
+                census,
+                float(cfg["salary_growth_rate_pct"]) / 100.0,
+                contribution_rules(cfg),
+                tuple(models.values()),
+                CURRENT_YEAR,
+                pay_schedule(cfg),
+                float(cfg["withdrawal_rate_pct"]) / 100.0,
+                cfg["filing_status"],
+            )
+            pretax, roth = after_tax
+            st.dataframe(
+                pd.DataFrame({
+                    "Model": names,
+                    "After-tax total, pre-tax": [f"${v:,.0f}" for v in pretax.sum(axis=1)],
+                    "After-tax total, Roth": [f"${v:,.0f}" for v in roth.sum(axis=1)],
+                    "Roth advantage": [signed_dollars(v) for v in (roth - pretax).sum(axis=1)],
+                    "Better off with Roth": [f"{v:.0%}" for v in (roth > pretax).mean(axis=1)] if len(census) else "",
+                }),
+                hide_index=True,
+                use_container_width=True,
+            )
+            header = (
+                *header,
+                *(f"After-tax pre-tax {n}" for n in names),
+                *(f"After-tax Roth {n}" for n in names),
+            )
+            columns = np.concatenate([finals, pretax, roth])
+
+        csv_col, xlsx_col = st.columns(2)
+        for col, fmt in ((csv_col, "csv"), (xlsx_col, "xlsx")):
+            with col:
+                st.download_button(
+                    f"Download participants ({fmt.upper()})",
+                    data=lambda fmt=fmt: export_file(lambda: census_rows(census, columns), fmt, header),
+                    file_name=f"census_projection.{fmt}",
+                    mime=EXPORT_MIME[fmt],
+                    on_click="ignore",
+                    use_container_width=True,
+                )
+
+def schedule(
+    age: int,
+    salary: float,
+    balance: float,
+    cfg: Dict[str, Any],
+    models: Dict[str, float],
+):
+    years = max(int(cfg["target_age"]) + 1 - age, 0)
+    return schedule_rows(
+        age,
+        salary,
+        balance,
+        years,
+        float(cfg["salary_growth_rate_pct"]) / 100.0,
+        contribution_rules(cfg),
+        models,
+        CURRENT_YEAR,
+        pay_schedule(cfg),
     )
 
-    salary_input = parse_number(st.text_input("Current annual salary ($)", f"{st.session_state.salary_used:,.0f}"))
-    balance_input = parse_number(st.text_input("Current 401(k) balance ($)", f"{st.session_state.balance_used:,.0f}"))
+def export_schedule(
+    age: int,
+    salary: float,
+    balance: float,
+    cfg: Dict[str, Any],
+    models: Dict[str, float],
+    fmt: str,
+):
+    return export_file(lambda: schedule(age, salary, balance, cfg, models), fmt)
+
+@st.cache_resource(show_spinner=False)
+def load_report_pool() -> ReportPool:
+    return ReportPool()
+
+def assumptions_caption(cfg: Dict[str, Any]) -> str:
+    salary_growth_dec = float(cfg["salary_growth_rate_pct"]) / 100.0
+    employee_dec = float(cfg["employee_contrib_rate_pct"]) / 100.0
+    employer_dec = float(cfg["employer_contrib_rate_pct"]) / 100.0
+    total_contrib_dec = employee_dec + employer_dec
+
+    return (
+        "Internal tool. "
+        f"Salary growth: {pct_from_decimal(salary_growth_dec)}. "
+        f"Annual contributions: {pct_from_decimal(total_contrib_dec)} "
+        f"({pct_from_decimal(employee_dec)} employee, {pct_from_decimal(employer_dec)} employer). "
+        + (f"Employer match: {cfg['match_formula']}. " if cfg.get("match_formula") else "")
+        + ("Subject to IRS contribution and compensation limits. " if cfg.get("apply_irs_limits") else "")
+        + f"Paid {cfg['pay_frequency'].lower()}, compounded {cfg['compounding_frequency'].lower()}, "
+        + f"contributions credited at {cfg['contribution_timing'].lower()}. "
+        + f"Retirement age: {int(cfg['target_age'])}. "
+        f"Model selection: {cfg.get('model_selection', ALL_MODELS)}."
+    )
 
-    with st.expander("Assumptions", expanded=False):
-        cfg["salary_growth_rate_pct"] = st.number_input("Annual salary growth (%)", 0.0, 50.0, float(cfg["salary_growth_rate_pct"]), step=0.01)
-        cfg["employee_contrib_rate_pct"] = st.number_input("Employee contribution rate (%)", 0.0, 50.0, float(cfg["employee_contrib_rate_pct"]), step=0.01)
-        cfg["employer_contrib_rate_pct"] = st.number_input("Employer contribution rate (%)", 0.0, 50.0, float(cfg["employer_contrib_rate_pct"]), step=0.01)
+@st.fragment(run_every="1s")
+def report_progress(keys: Tuple[str, ...]) -> None:
+    # Polls while reports render. Once none is pending, one full rerun swaps
+    # the disabled buttons for downloads and stops the polling.
+    pool = load_report_pool()
+    if all(pool.status(key) != "pending" for key in keys):
+        st.rerun()
+    st.caption("Rendering in the background; you can keep working.")
+
+def report_panel(fig: go.Figure, cfg: Dict[str, Any], export_args: tuple) -> None:
+    # Rendering happens in the report pool; this run only submits the job or
+    # offers the cached file.
+    pool = load_report_pool()
+    _, _, _, _, export_models = export_args
+    pending = []
+    # The chart, caption and table code, so an edit to any renders afresh.
+    version = report_version(chart_panel, assumptions_caption, schedule)
+
+    for col, (fmt, label) in zip(st.columns(len(REPORT_FORMATS)), REPORT_FORMATS.items()):
+        key = report_key(fmt, (*export_args, CURRENT_YEAR), version)
+        status = pool.status(key)
+        with col:
+            if status == "ready":
+                st.download_button(
+                    f"Download {label}",
+                    data=lambda key=key: pool.get(key) or b"",
+                    file_name=f"401k_report.{fmt}",
+                    mime=REPORT_MIME[fmt],
+                    on_click="ignore",
+                    use_container_width=True,
+                )
+                continue
+
+            if status == "pending":
+                st.button(f"Rendering {label}…", key=f"report_{fmt}", disabled=True, use_container_width=True)
+                pending.append(key)
+                continue
+
+            verb = "Retry" if status == "failed" else "Prepare"
+            if st.button(f"{verb} {label}", key=f"report_{fmt}", use_container_width=True):
+                spec = {
+                    "fmt": fmt,
+                    "figure": fig.to_json(),
+                    "title": REPORT_TITLE,
+                    "caption": assumptions_caption(cfg),
+                    "header": SCHEDULE_HEADER,
+                    "rows": list(schedule(*export_args)),
+                }
+                if pool.submit(key, spec, tags=[tag("return", r) for r in export_models.values()]):
+                    pending.append(key)
+                else:
+                    st.warning("The report queue is full; try again in a moment.")
+            elif status == "failed":
+                st.caption(f"The last attempt failed to render: {pool.error(key)}")
+
+    if pending:
+        report_progress(tuple(pending))
+
+
+DEFAULT_AGE = 42
+DEFAULT_SALARY = 84000.0
+DEFAULT_BALANCE = 76500.0
+
+DEFAULT_CFG = {
+    "target_age": 65,
+    "salary_growth_rate_pct": round(ASSUMPTIONS.salary_growth_rate * 100.0, 4),
+    "employee_contrib_rate_pct": 7.8,
+    "employer_contrib_rate_pct": 4.6,
+    "match_formula": "",
+    "apply_irs_limits": True,
+    "pay_frequency": "Semimonthly",
+    "compounding_frequency": "Semimonthly",
+    "contribution_timing": "End of period",
+    "model_selection": "Core",
+    "custom_models": "",
+    "backtest": False,
+    "drawdown": True,
+    "withdrawal_rate_pct": 4.0,
+    "inflation_rate_pct": 2.5,
+    "plan_to_age": 95,
+    "return_volatility_pct": 12.0,
+    "tax_comparison": False,
+    "filing_status": FILING_STATUSES[0],
+    # Census rows without their own retirement age; apart from target_age so
+    # a census default never reaches Individual mode.
+    "census_retirement_age": 65,
+}
+
+def precompute(age: int, salary: float, balance: float, cfg: Dict[str, Any], models: Dict[str, float]) -> None:
+    # The cached calls chart_panel makes for these inputs, with the same
+    # arguments, so a later render finds them all cached.
+    args = projection_args(age, salary, balance, cfg, models)
+    returns = args[4]
+    values = compute_projection_matrix(*args)
+
+    drawdown_years = int(cfg["plan_to_age"]) - (age + values.shape[1] - 1)
+    if cfg.get("drawdown") and drawdown_years > 0:
+        compute_drawdown(
+            tuple(float(v) for v in values[:, -1]),
+            tuple(float(r) for r in returns),
+            drawdown_years,
+            float(cfg["withdrawal_rate_pct"]) / 100.0,
+            float(cfg["inflation_rate_pct"]) / 100.0,
+            float(cfg["return_volatility_pct"]) / 100.0,
+        )
 
-    model_choice = st.selectbox(
-        "Model selection",
-        MODEL_DROPDOWN_OPTIONS,
-        index=MODEL_DROPDOWN_OPTIONS.index(cfg["model_selection"]) if cfg["model_selection"] in MODEL_DROPDOWN_OPTIONS else 0,
+    if cfg.get("tax_comparison"):
+        compute_tax_comparison(
+            age, salary, balance, projection_cfg(cfg), returns, CURRENT_YEAR,
+            float(cfg["withdrawal_rate_pct"]) / 100.0, cfg["filing_status"],
+        )
+
+def scenario_key(age: int, salary: float, balance: float, cfg: Dict[str, Any], models: Dict[str, float]) -> str:
+    return projection_cache.cache_key(
+        "scenario", "", (age, salary, balance, {k: cfg.get(k) for k in SCENARIO_CFG_KEYS}, models), {}
     )
 
-    calculate = st.button("Calculate", type="primary")
+def speculative_cfgs(age: int, cfg: Dict[str, Any], models: Dict[str, float]):
+    # Likely next Calculates, nearest first: retirement age and contribution
+    # rate one step either way, then the other model selections.
+    target, rate = int(cfg["target_age"]), float(cfg["employee_contrib_rate_pct"])
+    for step in (SPECULATIVE_AGE_STEP, -SPECULATIVE_AGE_STEP):
+        if age < target + step <= 100:
+            yield {**cfg, "target_age": target + step}
+    for step in (SPECULATIVE_CONTRIB_STEP_PCT, -SPECULATIVE_CONTRIB_STEP_PCT):
+        if 0.0 <= rate + step <= 50.0:
+            yield {**cfg, "employee_contrib_rate_pct": round(rate + step, 4)}
+    for name in [ALL_MODELS, *models]:
+        if name != cfg["model_selection"]:
+            yield {**cfg, "model_selection": name}
+
+@st.cache_resource(show_spinner=False)
+def load_speculator() -> Speculator:
+    return Speculator()
+
+def speculate(age: int, salary: float, balance: float, cfg: Dict[str, Any], models: Dict[str, float]) -> None:
+    owner = st.session_state.setdefault("speculation_owner", uuid.uuid4().hex)
+    models = dict(models)
+    load_speculator().submit(owner, [
+        (
+            scenario_key(age, salary, balance, variant, models),
+            lambda variant=variant: precompute(age, salary, balance, variant, models),
+        )
+        for variant in speculative_cfgs(age, cfg, models)
+    ])
+
+def warm_default_scenario() -> None:
+    # The first chart a new session draws, and the All Models view one click
+    # away.
+    model = DEFAULT_CFG["model_selection"] if DEFAULT_CFG["model_selection"] in MODEL_OPTIONS else next(iter(MODEL_OPTIONS))
+    for selection in (model, ALL_MODELS):
+        precompute(
+            DEFAULT_AGE,
+            DEFAULT_SALARY,
+            DEFAULT_BALANCE,
+            {**DEFAULT_CFG, "model_selection": selection},
+            MODEL_OPTIONS,
+        )
+
+def share_scenario(age: int, salary: float, balance: float, cfg: Dict[str, Any], models: Dict[str, float]) -> None:
+    # Keeps the address bar on the scenario shown, so a reload or a copied
+    # URL reopens it.
+    scenario = {
+        "age": age,
+        "salary": salary,
+        "balance": balance,
+        "cfg": {k: cfg[k] for k in PERMALINK_CFG_KEYS if cfg[k] != DEFAULT_CFG[k]},
+    }
+    query = permalink.params(scenario, compute_projection_matrix.key(*projection_args(age, salary, balance, cfg, models)))
+    st.session_state.permalink_token = query[permalink.SCENARIO_PARAM]
+    if st.query_params.to_dict() != query:
+        st.query_params.from_dict(query)
+
+    with st.popover("Share scenario", use_container_width=True):
+        st.code(f"{(st.context.url or '').split('?')[0]}?{urlencode(query)}", language=None, wrap_lines=True)
+        st.caption("Opens these inputs and assumptions; the chart comes straight from the cache when it can.")
+
+def linked_scenario(scenario: Dict[str, Any]) -> Tuple[int, float, float, Dict[str, Any]]:
+    # Brings a decoded link to the types and ranges the widgets hold. Raises
+    # ValueError, TypeError, KeyError or OverflowError for anything that can't
+    # be shown.
+    age, salary, balance = int(scenario["age"]), float(scenario["salary"]), float(scenario["balance"])
+    linked = {k: DEFAULT_CFG[k] for k in PERMALINK_CFG_KEYS}
+    for k, v in dict(scenario.get("cfg", {})).items():
+        if k in linked:
+            linked[k] = type(DEFAULT_CFG[k])(v)
+    for k, (low, high) in PERMALINK_RANGES.items():
+        # JSON allows NaN, which min and max pass straight through.
+        if not np.isfinite(linked[k]):
+            raise ValueError("Permalink numbers must be finite.")
+        linked[k] = min(max(linked[k], low), high)
+
+    choices = {
+        "pay_frequency": PAY_FREQUENCIES,
+        "compounding_frequency": COMPOUNDING_FREQUENCIES,
+        "contribution_timing": CONTRIBUTION_TIMINGS,
+        "filing_status": FILING_STATUSES,
+    }
+    if any(linked[k] not in options for k, options in choices.items()):
+        raise ValueError("Permalink has an unknown option.")
+    if not (18 <= age < linked["target_age"] and np.isfinite([salary, balance]).all()):
+        raise ValueError("Permalink ages or amounts are out of range.")
+    return age, salary, balance, linked
+
+def open_permalink(cfg: Dict[str, Any]) -> None:
+    # A link replaces the scenario without going through the form. When it
+    # still hashes to the key it carries, the chart renders from the stored
+    # projection; those opens are counted under their own cache stats name.
+    token = st.query_params.get(permalink.SCENARIO_PARAM)
+    if not token or token == st.session_state.get("permalink_token"):
+        return
+    st.session_state.permalink_token = token
 
-if calculate:
-    if salary_input is None or salary_input <= 0:
-        st.error("Enter a salary greater than $0.")
-    elif balance_input is None:
-        st.error("Enter a current 401(k) balance.")
-    elif int(age_input) >= int(target_age_input):
-        st.error("Retirement age must be greater than current age.")
-    else:
-        st.session_state.age_used = int(age_input)
-        st.session_state.salary_used = float(salary_input)
-        st.session_state.balance_used = float(balance_input)
+    try:
+        age, salary, balance, linked = linked_scenario(permalink.decode(token))
+    except (ValueError, TypeError, KeyError, OverflowError):
+        metrics.incr("permalink.invalid")
+        st.warning("This link doesn't describe a scenario, so the calculator starts from the defaults.")
+        return
+
+    st.session_state.age_used = age
+    st.session_state.salary_used = salary
+    st.session_state.balance_used = balance
+    cfg.update(linked)
+
+    models = model_options(cfg)
+    if cfg["model_selection"] not in [*models, ALL_MODELS]:
+        return
+    key = compute_projection_matrix.key(*projection_args(age, salary, balance, cfg, models))
+    values = permalink.cached(key, st.query_params.get(permalink.KEY_PARAM, ""))
+    if values is not None:
+        st.session_state.permalink_projection = (key, values)
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    return warmup.start([
+        ("brand_fonts", load_brand_fonts),
+        ("backtest_returns", load_backtest_returns),
+        ("default_scenario", warm_default_scenario),
+    ])
+
+start_warmup()
+
+def input_panel(cfg: Dict[str, Any]) -> Dict[str, float]:
+    # The widgets sit in a form, so editing them reruns nothing until Calculate.
+    # New custom models show up in the model dropdown after the next Calculate.
+    models = model_options(cfg)
+    dropdown_options = list(models.keys()) + [ALL_MODELS]
+
+    with st.form("inputs", border=False):
+        st.subheader("Inputs")
+
+        age_input = st.number_input("Current age", 18, 100, int(st.session_state.age_used))
+        target_age_input = st.number_input(
+            "Retirement age",
+            min_value=max(1, int(age_input) + 1),
+            max_value=100,
+            value=int(cfg["target_age"]),
+            step=1,
+        )
+
+        salary_input = parse_number(st.text_input("Current annual salary ($)", f"{st.session_state.salary_used:,.0f}"))
+        balance_input = parse_number(st.text_input("Current 401(k) balance ($)", f"{st.session_state.balance_used:,.0f}"))
+
+        assumption_inputs(cfg)
+        retirement_income_inputs(cfg)
+        tax_inputs(cfg)
+
+        with st.expander("Custom models", expanded=False):
+            cfg["custom_models"] = st.text_area(
+                "One model per line as Name: annual return (%)",
+                cfg["custom_models"],
+                placeholder="Plan Target 2040: 7.45\nPlan S&P 500 Index: 10.2",
+            )
+            models = model_options(cfg)
+            dropdown_options = list(models.keys()) + [ALL_MODELS]
+
+        model_choice = st.selectbox(
+            "Model selection",
+            dropdown_options,
+            index=dropdown_options.index(cfg["model_selection"]) if cfg["model_selection"] in dropdown_options else 0,
+        )
 
-        cfg["target_age"] = int(target_age_input)
-        cfg["model_selection"] = model_choice
+        backtest_years, _ = load_backtest_returns()
+        cfg["backtest"] = st.checkbox(
+            f"Historical backtest ({RETURNS_LABEL} {backtest_years[0]}-{backtest_years[-1]})",
+            value=bool(cfg["backtest"]),
+            help="Replays every historical start year over your horizon and shows the best, median and worst outcomes.",
+        )
 
-with right:
+        calculate = st.form_submit_button("Calculate", type="primary")
+
+    if calculate:
+        if salary_input is None or salary_input <= 0:
+            st.error("Enter a salary greater than $0.")
+        elif balance_input is None:
+            st.error("Enter a current 401(k) balance.")
+        elif int(age_input) >= int(target_age_input):
+            st.error("Retirement age must be greater than current age.")
+        else:
+            st.session_state.age_used = int(age_input)
+            st.session_state.salary_used = float(salary_input)
+            st.session_state.balance_used = float(balance_input)
+
+            cfg["target_age"] = int(target_age_input)
+            cfg["model_selection"] = model_choice
+            # Read once by the chart render this Calculate drives.
+            st.session_state.calculated = True
+
+    return models
+
+@st.fragment
+@metrics.timed("rerun.chart_panel")
+def chart_panel(cfg: Dict[str, Any], models: Dict[str, float]) -> None:
     st.subheader("Projected 401(k) Balance")
+    scenario = (
+        int(st.session_state.age_used),
+        float(st.session_state.salary_used),
+        float(st.session_state.balance_used),
+    )
+    # Only a Calculate asks for a new scenario; report polling, button clicks
+    # and mode switches rerender the same one and neither claim nor speculate.
+    calculated = st.session_state.pop("calculated", False)
+    if calculated:
+        load_speculator().claim(scenario_key(*scenario, cfg, models))
 
     fig = go.Figure()
-    selected = cfg.get("model_selection", "All Models")
-
-    if selected == "All Models":
-        dfs = {}
-        for name, r in MODEL_OPTIONS.items():
-            dfs[name] = compute_projection_one_line(
-                int(st.session_state.age_used),
-                float(st.session_state.salary_used),
-                float(st.session_state.balance_used),
-                cfg,
-                r,
-            )
+    selected = cfg.get("model_selection", ALL_MODELS)
+
+    if selected == ALL_MODELS:
+        names = list(models.keys())
+        values = scenario_projection(*scenario, cfg, models)
+        ages = int(st.session_state.age_used) + np.arange(values.shape[1])
 
-        base_age = next(iter(dfs.values()))["age"]
-        x_max = base_age.iloc[-1]
-        x_min = base_age.iloc[0]
-        x_padding = 1 if len(base_age) > 1 else 0.5
+        x_max = ages[-1]
+        x_min = ages[0]
+        x_padding = 1 if len(ages) > 1 else 0.5
 
-        final_lines = []
+        line_colors = {name: MODEL_COLORS[i % len(MODEL_COLORS)] for i, name in enumerate(names)}
 
-        for name, dfi in dfs.items():
+        for name, row in zip(names, values):
             fig.add_trace(
                 go.Scatter(
-                    x=dfi["age"],
-                    y=dfi["value"],
+                    x=ages,
+                    y=row,
                     mode="lines",
-                    name=f"{name} ({pct_from_decimal(float(MODEL_OPTIONS[name]))})",
-                    line=dict(width=4),
+                    name=f"{name} ({pct_from_decimal(float(models[name]))})",
+                    line=dict(color=line_colors[name], width=4 if len(names) <= 8 else 2),
                     showlegend=False,
                 )
             )
-            final_lines.append((name, float(dfi["value"].iloc[-1])))
 
-        final_lines.sort(key=lambda t: t[1], reverse=True)
+        finals = values[:, -1]
+        retirement_values = dict(zip(names, finals))
+        ranking = np.argsort(-finals, kind="stable")
+        shown = ranking[:ANNOTATION_MAX_MODELS]
 
-        annotation_html = "<br>".join([f"<b>{name}:</b> ${val:,.0f}" for name, val in final_lines])
+        annotation_lines = [f"<b>{names[k]}:</b> ${finals[k]:,.0f}" for k in shown]
+        if len(ranking) > len(shown):
+            annotation_lines.append(f"<i>+{len(ranking) - len(shown)} more</i>")
+        annotation_html = "<br>".join(annotation_lines)
 
         fig.add_annotation(
             xref="paper", yref="paper",
@@ -439,14 +1210,9 @@ with right:
         )
 
     else:
-        model_return = float(MODEL_OPTIONS[selected])
-        df = compute_projection_one_line(
-            int(st.session_state.age_used),
-            float(st.session_state.salary_used),
-            float(st.session_state.balance_used),
-            cfg,
-            model_return,
-        )
+        model_return = float(models[selected])
+        values = scenario_projection(*scenario, cfg, models)
+        df = pd.DataFrame({"age": scenario[0] + np.arange(values.shape[1]), "value": values[0]})
 
         fig.add_trace(
             go.Scatter(
@@ -464,6 +1230,8 @@ with right:
         x_padding = 1 if len(df) > 1 else 0.5
 
         final_val = float(df["value"].iloc[-1])
+        retirement_values = {selected: final_val}
+        line_colors = {selected: with_color}
 
         fig.add_annotation(
             xref="paper", yref="paper",
@@ -479,6 +1247,121 @@ with right:
             borderpad=8,
         )
 
+    after_tax = None
+
+    if cfg.get("tax_comparison"):
+        tax_names = list(retirement_values.keys())
+        after_tax = compute_tax_comparison(
+            int(st.session_state.age_used),
+            float(st.session_state.salary_used),
+            float(st.session_state.balance_used),
+            projection_cfg(cfg),
+            tuple(float(models[n]) for n in tax_names),
+            CURRENT_YEAR,
+            float(cfg["withdrawal_rate_pct"]) / 100.0,
+            cfg["filing_status"],
+        )
+        tax_ages = np.arange(x_min, x_min + after_tax.shape[2])
+
+        for label, dash, rows in (("pre-tax", "dot", after_tax[0]), ("Roth", "dashdot", after_tax[1])):
+            for name, row in zip(tax_names, rows):
+                fig.add_trace(
+                    go.Scatter(
+                        x=tax_ages,
+                        y=row,
+                        mode="lines",
+                        name=f"{name} after tax, {label}",
+                        line=dict(color=line_colors[name], width=2, dash=dash),
+                        showlegend=False,
+                    )
+                )
+
+    drawdown_years = int(cfg["plan_to_age"]) - int(x_max)
+    drawdown = None
+
+    if cfg.get("drawdown") and drawdown_years > 0:
+        drawdown_names = list(retirement_values.keys())
+        drawdown = compute_drawdown(
+            tuple(float(v) for v in retirement_values.values()),
+            tuple(float(models[n]) for n in drawdown_names),
+            drawdown_years,
+            float(cfg["withdrawal_rate_pct"]) / 100.0,
+            float(cfg["inflation_rate_pct"]) / 100.0,
+            float(cfg["return_volatility_pct"]) / 100.0,
+        )
+        drawdown_ages = np.arange(x_max, x_max + drawdown_years + 1)
+
+        if drawdown["band"] is not None:
+            low, _, high = drawdown["band"]
+            fig.add_trace(go.Scatter(
+                x=drawdown_ages, y=high, mode="lines", line=dict(width=0),
+                hoverinfo="skip", showlegend=False,
+            ))
+            fig.add_trace(go.Scatter(
+                x=drawdown_ages, y=low, mode="lines", line=dict(width=0),
+                fill="tonexty", fillcolor=ACCENT_SOFT,
+                name="Simulated P10-P90", showlegend=False,
+            ))
+
+        for name, row in zip(drawdown_names, drawdown["paths"]):
+            fig.add_trace(
+                go.Scatter(
+                    x=drawdown_ages,
+                    y=row,
+                    mode="lines",
+                    name=f"{name} drawdown",
+                    line=dict(color=line_colors[name], width=3, dash="dash"),
+                    showlegend=False,
+                )
+            )
+
+        fig.add_vline(x=x_max, line=dict(color=grid_color, width=2, dash="dot"))
+        x_max = x_max + drawdown_years
+
+    if cfg.get("backtest"):
+        window_count, outcomes = compute_backtest(
+            int(st.session_state.age_used),
+            float(st.session_state.salary_used),
+            float(st.session_state.balance_used),
+            projection_cfg(cfg),
+            CURRENT_YEAR,
+        )
+
+        for label, (start_year, path) in outcomes.items():
+            fig.add_trace(
+                go.Scatter(
+                    x=np.arange(x_min, x_min + len(path)),
+                    y=path,
+                    mode="lines",
+                    name=f"{RETURNS_LABEL} {label.lower()} window (from {start_year})",
+                    line=dict(color=BACKTEST_COLORS[label], width=2, dash="dot"),
+                    showlegend=False,
+                )
+            )
+
+        if outcomes:
+            fig.add_annotation(
+                xref="paper", yref="paper",
+                x=0.98, y=0.02,
+                xanchor="right", yanchor="bottom",
+                text="<br>".join(
+                    [f"<b>{RETURNS_LABEL} backtest</b> ({window_count} windows)"]
+                    + [
+                        f"{label} (from {start_year}): ${path[-1]:,.0f}"
+                        for label, (start_year, path) in reversed(outcomes.items())
+                    ]
+                ),
+                showarrow=False,
+                align="left",
+                font=dict(family="Urbanist", size=12, color=axis_color),
+                bgcolor="rgba(255,255,255,0.85)",
+                bordercolor="rgba(0,0,0,0.08)",
+                borderwidth=1,
+                borderpad=8,
+            )
+        else:
+            st.caption(f"Backtest unavailable: the horizon is longer than the {RETURNS_LABEL} history.")
+
     fig.update_layout(
         height=450,
         margin=dict(l=24, r=16, t=20, b=55),
@@ -505,18 +1388,121 @@ with right:
     )
 
     st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    warmup.chart_rendered(st.session_state)
+
+    if drawdown is not None:
+        retire_age = int(cfg["plan_to_age"]) - drawdown_years
+        st.dataframe(
+            pd.DataFrame({
+                "Model": drawdown_names,
+                "Balance at retirement": [f"${v:,.0f}" for v in retirement_values.values()],
+                f"At {float(cfg['withdrawal_rate_pct']):.2f}% withdrawal": [
+                    f"Runs out at age {retire_age + int(n)}" if n >= 0 else f"Lasts past age {int(cfg['plan_to_age'])}"
+                    for n in drawdown["depletion"]
+                ],
+                f"Sustainable rate ({TARGET_SUCCESS:.0%} success)": [pct_from_decimal(r) for r in drawdown["rates"]],
+                "First-year income": [f"${v * r:,.0f}" for v, r in zip(retirement_values.values(), drawdown["rates"])],
+            }),
+            hide_index=True,
+            use_container_width=True,
+        )
 
-salary_growth_dec = float(cfg["salary_growth_rate_pct"]) / 100.0
-employee_dec = float(cfg["employee_contrib_rate_pct"]) / 100.0
-employer_dec = float(cfg["employer_contrib_rate_pct"]) / 100.0
-total_contrib_dec = employee_dec + employer_dec
-
-st.space("large")
-st.caption(
-    "Internal tool. "
-    f"Salary growth: {pct_from_decimal(salary_growth_dec)}. "
-    f"Annual contributions: {pct_from_decimal(total_contrib_dec)} "
-    f"({pct_from_decimal(employee_dec)} employee, {pct_from_decimal(employer_dec)} employer). "
-    f"Retirement age: {int(cfg['target_age'])}. "
-    f"Model selection: {cfg.get('model_selection', 'All Models')}."
-)
+    if after_tax is not None:
+        pretax, roth = after_tax[:, :, -1]
+        st.dataframe(
+            pd.DataFrame({
+                "Model": tax_names,
+                "After tax, pre-tax deferrals": [f"${v:,.0f}" for v in pretax],
+                "After tax, Roth deferrals": [f"${v:,.0f}" for v in roth],
+                "Roth advantage": [signed_dollars(v) for v in roth - pretax],
+            }),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.caption(
+            f"Federal income tax only, {cfg['filing_status'].lower()}. Dotted lines defer pre-tax, dash-dot lines "
+            "make the employee deferrals Roth at the same take-home pay; employer money and the current balance stay pre-tax."
+        )
+
+    export_models = dict(models) if selected == ALL_MODELS else {selected: models[selected]}
+    export_args = (
+        int(st.session_state.age_used),
+        float(st.session_state.salary_used),
+        float(st.session_state.balance_used),
+        dict(cfg),
+        export_models,
+    )
+
+    csv_col, xlsx_col = st.columns(2)
+    for col, fmt in ((csv_col, "csv"), (xlsx_col, "xlsx")):
+        with col:
+            st.download_button(
+                f"Download schedule ({fmt.upper()})",
+                data=lambda fmt=fmt: export_schedule(*export_args, fmt),
+                file_name=f"401k_schedule.{fmt}",
+                mime=EXPORT_MIME[fmt],
+                on_click="ignore",
+                use_container_width=True,
+            )
+
+    report_panel(fig, cfg, export_args)
+    share_scenario(*scenario, cfg, models)
+
+    # Off the rerun's path: fill the caches for the tweaks most likely next.
+    if calculated:
+        speculate(*scenario, dict(cfg), models)
+
+# Page config, CSS and fonts run once per page load; Calculate reruns only
+# this fragment.
+@st.fragment
+@metrics.timed("rerun.calculator")
+def calculator(cfg: Dict[str, Any]) -> None:
+    left, right = st.columns([1, 2])
+
+    with left:
+        models = input_panel(cfg)
+
+    with right:
+        chart_panel(cfg, models)
+
+    st.space("large")
+    st.caption(assumptions_caption(cfg))
+
+st.session_state.setdefault("age_used", DEFAULT_AGE)
+st.session_state.setdefault("salary_used", DEFAULT_SALARY)
+st.session_state.setdefault("balance_used", DEFAULT_BALANCE)
+st.session_state.setdefault("cfg", {})
+cfg = st.session_state.cfg
+
+for key, value in DEFAULT_CFG.items():
+    cfg.setdefault(key, value)
+
+open_permalink(cfg)
+
+models = model_options(cfg)
+MODEL_DROPDOWN_OPTIONS = list(models.keys()) + [ALL_MODELS]
+
+if cfg.get("model_selection") not in MODEL_DROPDOWN_OPTIONS:
+    cfg["model_selection"] = MODEL_DROPDOWN_OPTIONS[0]
+
+st.title("Internal Retire Calc")
+
+mode = st.radio("Mode", [INDIVIDUAL_MODE, CENSUS_MODE], horizontal=True, label_visibility="collapsed")
+
+if mode == CENSUS_MODE:
+    render_census(cfg, models)
+    metrics.observe("rerun.app", time.perf_counter() - SCRIPT_STARTED)
+    st.stop()
+
+calculator(cfg)
+
+with st.expander("Diagnostics", expanded=False):
+    st.json({
+        "assumptions_version": ASSUMPTIONS.version,
+        "persistent_cache": projection_cache.stats(),
+        "speculation": load_speculator().stats(),
+        "memory": memory.report(st.session_state, {"brand_fonts": load_brand_fonts()}),
+        "counters": metrics.snapshot(),
+    })
+
+metrics.observe("rerun.app", time.perf_counter() - SCRIPT_STARTED)
@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import metrics
+import projection_cache
+
+logger = logging.getLogger(__name__)
+
+# Model returns and the public calculator's assumptions. Edit by writing a new
+# file and renaming it over this one so readers never see a partial write.
+CONFIG_PATH = Path(
+    os.environ.get("ASSUMPTIONS_PATH", Path(__file__).resolve().parent / "Data" / "assumptions.json")
+)
+
+
+@dataclass(frozen=True)
+class Assumptions:
+    version: int
+    salary_growth_rate: float
+    without_help_return: float
+    uplift: float
+    models: Tuple[Tuple[str, float], ...]
+
+    @property
+    def with_help_return(self) -> float:
+        return self.without_help_return + self.uplift
+
+    @property
+    def model_options(self) -> Dict[str, float]:
+        return dict(self.models)
+
+
+def _rate(value, field: str) -> float:
+    try:
+        rate = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a number, got {value!r}") from None
+    if not -1.0 < rate < 1.0:
+        raise ValueError(f"{field} must be a decimal rate, got {rate}")
+    return rate
+
+
+def parse(data: dict) -> Assumptions:
+    try:
+        bison = data["bison"]
+        models = data["models"]
+        return Assumptions(
+            version=int(data["version"]),
+            salary_growth_rate=_rate(data["salary_growth_rate"], "salary_growth_rate"),
+            without_help_return=_rate(bison["without_help_return"], "bison.without_help_return"),
+            uplift=_rate(bison["uplift"], "bison.uplift"),
+            models=tuple((str(name), _rate(rate, f"models.{name}")) for name, rate in models.items()),
+        )
+    except KeyError as exc:
+        raise ValueError(f"Missing assumption {exc.args[0]!r}") from None
+    except (AttributeError, TypeError):
+        raise ValueError("Malformed assumptions file") from None
+
+
+def load(path: Path = CONFIG_PATH) -> Assumptions:
+    with open(path, encoding="utf-8") as fh:
+        return parse(json.load(fh))
+
+
+def changed_tags(old: Assumptions, new: Assumptions) -> List[str]:
+    # Cache tags of every input whose value moved; other entries stay valid.
+    tags = []
+    new_models = new.model_options
+    for name, rate in old.models:
+        if new_models.get(name) != rate:
+            tags.append(projection_cache.tag("return", rate))
+    if old.without_help_return != new.without_help_return:
+        tags.append(projection_cache.tag("return", old.without_help_return))
+    if old.with_help_return != new.with_help_return:
+        tags.append(projection_cache.tag("return", old.with_help_return))
+    if old.salary_growth_rate != new.salary_growth_rate:
+        tags.append(projection_cache.tag("salary_growth", old.salary_growth_rate))
+    return sorted(set(tags))
+
+
+_lock = threading.Lock()
+_current: Optional[Assumptions] = None
+_stamp: Optional[Tuple[int, int]] = None
+
+
+def current(path: Path = CONFIG_PATH) -> Assumptions:
+    # One stat per call; the file is only re-read when its mtime or size moves.
+    # A bad edit keeps serving the last good version.
+    global _current, _stamp
+    try:
+        info = os.stat(path)
+        stamp = (info.st_mtime_ns, info.st_size)
+    except OSError:
+        stamp = None
+
+    if _current is not None and stamp == _stamp:
+        return _current
+
+    with _lock:
+        if _current is not None and stamp == _stamp:
+            return _current
+
+        try:
+            fresh = load(path)
+        except (OSError, ValueError):
+            if _current is None:
+                raise
+            logger.exception("Keeping assumptions v%d; %s could not be loaded", _current.version, path)
+            metrics.incr("assumptions.reload_failed")
+            _stamp = stamp
+            return _current
+
+        if _current is not None and fresh != _current:
+            projection_cache.invalidate(changed_tags(_current, fresh))
+            metrics.incr("assumptions.reloaded")
+            logger.info("Assumptions reloaded: v%d -> v%d", _current.version, fresh.version)
+
+        _current, _stamp = fresh, stamp
+        return _current
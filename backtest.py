@@ -0,0 +1,50 @@
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from projection import DEFAULT_PAY_SCHEDULE, PaySchedule, annual_factors
+
+# S&P 500 annual total returns including dividends, 1928 onward
+# (Damodaran, NYU Stern historical returns dataset).
+RETURNS_PATH = Path(__file__).resolve().parent / "Data" / "sp500_annual_returns.csv"
+RETURNS_LABEL = "S&P 500"
+
+
+def load_returns(path: Path = RETURNS_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    data = np.loadtxt(path, delimiter=",", skiprows=1)
+    return data[:, 0].astype(int), data[:, 1] / 100.0
+
+
+def window_paths(
+    balance: float,
+    annual_contribs,
+    returns: np.ndarray,
+    pay_schedule: PaySchedule = DEFAULT_PAY_SCHEDULE,
+) -> np.ndarray:
+    # Balance paths for every historical start year, shape (windows, years + 1).
+    # With G_t the cumulative growth through year t:
+    #   V_t = G_t * (B + sum_{k<=t} c_k * f_k / G_k)
+    contribs = np.asarray(annual_contribs, dtype=float)
+    years = contribs.shape[-1]
+    if years == 0 or years > len(returns):
+        return np.empty((0, years + 1))
+
+    windows = sliding_window_view(returns, years)
+    growth, contrib_factor = annual_factors(windows, pay_schedule)
+    cumulative = np.cumprod(growth, axis=1)
+
+    paths = np.empty((len(windows), years + 1))
+    paths[:, 0] = balance
+    paths[:, 1:] = cumulative * (float(balance) + np.cumsum(contribs * contrib_factor / cumulative, axis=1))
+    return paths
+
+
+def summarize_windows(start_years: np.ndarray, paths: np.ndarray) -> Dict[str, Tuple[int, np.ndarray]]:
+    if not len(paths):
+        return {}
+
+    order = np.argsort(paths[:, -1], kind="stable")
+    picks = {"Worst": order[0], "Median": order[len(order) // 2], "Best": order[-1]}
+    return {label: (int(start_years[i]), paths[i]) for label, i in picks.items()}
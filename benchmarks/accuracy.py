@@ -0,0 +1,254 @@
+"""Fast paths against the high-precision reference, with timings.
+
+    python benchmarks/accuracy.py [cases] [seed]
+
+Sweeps random ages, salaries, balances, rates, contribution rules, pay and
+compounding schedules and horizons, plus hand-picked edge cases. Each fast
+path is compared with benchmarks/reference.py and timed in the same run.
+Columns: worst absolute error (dollars; unit_withdrawal_cost is a ratio),
+worst relative error, how many values round to a different cent and a
+different whole dollar, and time per case. Exits non-zero when any error reaches half a cent, the point where it
+could change an exported figure.
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import reference  # noqa: E402
+from backtest import load_returns, window_paths  # noqa: E402
+from census import project_census  # noqa: E402
+from contributions import ContributionRules, contribution_paths  # noqa: E402
+from decumulation import deterministic_growth, drawdown_paths, unit_withdrawal_cost, withdrawal_schedule  # noqa: E402
+from projection import COMPOUNDING_FREQUENCIES, PAY_FREQUENCIES, PaySchedule, project_matrix  # noqa: E402
+
+CASES = 200
+SEED = 43
+START_YEAR = 2026
+CENSUS_ROWS = 8
+HALF_CENT = 0.005
+
+MATCH_TIERS = (
+    (),
+    ((0.06, 0.5),),
+    ((0.03, 1.0), (0.02, 0.5)),
+    ((0.04, 1.0),),
+)
+
+
+def log_uniform(rng, low, high):
+    return float(np.exp(rng.uniform(np.log(low), np.log(high))))
+
+
+def random_case(rng):
+    age = rng.randint(18, 70)
+    return {
+        "age": age,
+        "years": rng.randint(0, max(0, 75 - age)),
+        "salary": rng.choice([0.0, log_uniform(rng, 10_000, 2_000_000)]),
+        "balance": rng.choice([0.0, log_uniform(rng, 100, 10_000_000)]),
+        "salary_growth": rng.uniform(-0.02, 0.08),
+        "returns": [rng.choice([0.0, rng.uniform(-0.3, 0.25)]) for _ in range(rng.randint(1, 4))],
+        "rules": ContributionRules(
+            employee_rate=rng.choice([0.0, rng.uniform(0.0, 0.5)]),
+            employer_rate=rng.choice([0.0, rng.uniform(0.0, 0.1)]),
+            match_tiers=rng.choice(MATCH_TIERS),
+            apply_limits=rng.random() < 0.7,
+        ),
+        "schedule": PaySchedule(
+            pay_periods=rng.choice(list(PAY_FREQUENCIES.values())),
+            compounding_periods=rng.choice(list(COMPOUNDING_FREQUENCIES.values())),
+            timing=rng.choice(["end", "start"]),
+        ),
+        "inflation": rng.uniform(0.0, 0.06),
+        "withdrawal_rate": rng.uniform(0.01, 0.12),
+    }
+
+
+def edge_cases():
+    base = {
+        "age": 42, "years": 24, "salary": 84_000.0, "balance": 76_500.0, "salary_growth": 0.03,
+        "returns": [0.0878], "rules": ContributionRules(0.078, 0.046), "schedule": PaySchedule(),
+        "inflation": 0.025, "withdrawal_rate": 0.04,
+    }
+    yield base
+    yield {**base, "returns": [0.0]}
+    yield {**base, "years": 0}
+    yield {**base, "years": 1}
+    yield {**base, "balance": 0.0, "salary": 0.0}
+    yield {**base, "age": 18, "years": 57, "returns": [0.1176], "balance": 10_000_000.0}
+    yield {**base, "schedule": PaySchedule(52, 365, "start")}
+    yield {**base, "schedule": PaySchedule(26, 1, "end")}
+
+
+class Errors:
+    def __init__(self, name):
+        self.name = name
+        self.values = 0
+        self.max_abs = 0.0
+        self.max_rel = 0.0
+        self.cents_moved = 0
+        self.dollars_moved = 0
+        self.fast_seconds = 0.0
+        self.ref_seconds = 0.0
+        self.cases = 0
+        self.worst = None
+
+    def add(self, fast, ref, case):
+        self.cases += 1
+        for f, r in zip(np.ravel(fast), ref):
+            f, r = Decimal(float(f)), Decimal(r)
+            err = abs(f - r)
+            rel = err / abs(r) if r else (Decimal(0) if not err else Decimal("Infinity"))
+            self.values += 1
+            if float(err) > self.max_abs:
+                self.max_abs, self.worst = float(err), case
+            self.max_rel = max(self.max_rel, float(rel))
+            self.cents_moved += round(f, 2) != round(r, 2)
+            self.dollars_moved += round(f) != round(r)
+
+    def row(self):
+        per = max(self.cases, 1)
+        fast_us, ref_us = self.fast_seconds / per * 1e6, self.ref_seconds / per * 1e6
+        return (
+            f"{self.name:<22} {self.cases:>6} {self.values:>8} {self.max_abs:>12.3e} {self.max_rel:>10.2e} "
+            f"{self.cents_moved:>6} {self.dollars_moved:>6} {fast_us:>10.1f} {ref_us:>12.1f} "
+            f"{ref_us / fast_us if fast_us else 0:>9.0f}x"
+        )
+
+
+def timed(errors, side, func, *args):
+    start = time.perf_counter()
+    out = func(*args)
+    elapsed = time.perf_counter() - start
+    if side == "fast":
+        errors.fast_seconds += elapsed
+    else:
+        errors.ref_seconds += elapsed
+    return out
+
+
+def check_case(case, checks, history):
+    age, years, rules, schedule = case["age"], case["years"], case["rules"], case["schedule"]
+
+    # Contributions after salary growth, IRS limits and match tiers.
+    steps = (checks["contribution_paths"], checks["project_matrix"])
+    before = [(step.fast_seconds, step.ref_seconds) for step in steps]
+    errors = checks["contribution_paths"]
+    _, employee, employer = timed(
+        errors, "fast", contribution_paths, age, case["salary"], years, case["salary_growth"], rules, START_YEAR
+    )
+    ref_employee, ref_employer = timed(
+        errors, "ref", reference.contributions, age, case["salary"], years, case["salary_growth"], rules, START_YEAR
+    )
+    errors.add(np.concatenate([employee, employer]), ref_employee + ref_employer, case)
+
+    # Compounding alone: both sides get the same float contributions.
+    contribs = employee + employer
+    errors = checks["project_matrix"]
+    fast = timed(errors, "fast", project_matrix, case["balance"], contribs, tuple(case["returns"]), schedule)
+    ref = []
+    for r in case["returns"]:
+        ref += timed(errors, "ref", reference.project, case["balance"], contribs, [r] * years, schedule)
+    errors.add(fast, ref, case)
+
+    # End to end: the reference builds its own contributions. Timed as the sum
+    # of the two steps above.
+    errors = checks["projection end-to-end"]
+    ref_contribs = [e + m for e, m in zip(ref_employee, ref_employer)]
+    ref = []
+    for r in case["returns"]:
+        ref += reference.project(case["balance"], ref_contribs, [r] * years, schedule)
+    for step, (fast_seconds, ref_seconds) in zip(steps, before):
+        errors.fast_seconds += step.fast_seconds - fast_seconds
+        errors.ref_seconds += step.ref_seconds - ref_seconds
+    errors.add(fast, ref, case)
+
+    # Historical windows replace the flat rate with one return per year.
+    errors = checks["window_paths"]
+    paths = timed(errors, "fast", window_paths, case["balance"], contribs, history, schedule)
+    if len(paths):
+        picks = sorted({0, len(paths) // 2, len(paths) - 1})
+        ref = []
+        for w in picks:
+            ref += timed(errors, "ref", reference.project, case["balance"], contribs, history[w:w + years], schedule)
+        errors.add(paths[picks], ref, case)
+
+    # Decumulation on the deterministic path, from each model's final balance.
+    errors = checks["drawdown_paths"]
+    horizon = max(95 - age - years, 1)
+    finals = fast[:, -1]
+    growth = deterministic_growth(case["returns"], horizon)
+    withdrawals = withdrawal_schedule(1.0, horizon, case["inflation"]) * case["withdrawal_rate"]
+    drawn = timed(errors, "fast", drawdown_paths, finals, withdrawals[None, :] * finals[:, None], growth)
+    ref = []
+    for balance, row in zip(finals, growth):
+        ref += timed(errors, "ref", reference.drawdown, balance, withdrawals * balance, row)
+    errors.add(drawn, ref, case)
+
+    errors = checks["unit_withdrawal_cost"]
+    costs = timed(errors, "fast", unit_withdrawal_cost, case["inflation"], growth)
+    ref = [timed(errors, "ref", reference.unit_withdrawal_cost, case["inflation"], row) for row in growth]
+    errors.add(costs, ref, case)
+
+
+def check_census(rng, checks):
+    # One plan, a handful of participants, each to their own retirement age.
+    case = random_case(rng)
+    ages = np.array([rng.randint(18, 70) for _ in range(CENSUS_ROWS)])
+    retirement = np.array([rng.randint(a, 75) for a in ages])
+    salaries = np.array([log_uniform(rng, 10_000, 600_000) for _ in ages])
+    balances = np.array([log_uniform(rng, 100, 3_000_000) for _ in ages])
+    errors = checks["project_census"]
+
+    finals = timed(
+        errors, "fast", project_census, ages, salaries, balances, retirement,
+        case["salary_growth"], case["rules"], case["returns"], START_YEAR, case["schedule"],
+    )
+    ref = []
+    for r in case["returns"]:
+        for a, s, b, ra in zip(ages, salaries, balances, retirement):
+            years = int(ra) + 1 - int(a)
+            employee, employer = timed(
+                errors, "ref", reference.contributions, int(a), s, years, case["salary_growth"], case["rules"], START_YEAR
+            )
+            contribs = [e + m for e, m in zip(employee, employer)]
+            ref.append(timed(errors, "ref", reference.project, b, contribs, [r] * years, case["schedule"])[-1])
+    errors.add(finals, ref, case)
+
+
+def main(cases, seed):
+    rng = random.Random(seed)
+    _, history = load_returns()
+    names = (
+        "contribution_paths", "project_matrix", "projection end-to-end",
+        "window_paths", "drawdown_paths", "unit_withdrawal_cost", "project_census",
+    )
+    checks = {name: Errors(name) for name in names}
+
+    for case in list(edge_cases()) + [random_case(rng) for _ in range(cases)]:
+        check_case(case, checks, history)
+    for _ in range(max(cases // 10, 1)):
+        check_census(rng, checks)
+
+    print(f"{cases} random cases + edge cases, seed {seed}, reference at {reference.PRECISION} digits")
+    print(
+        f"{'fast path':<22} {'cases':>6} {'values':>8} {'max abs':>12} {'max rel':>10} "
+        f"{'cents':>6} {'$':>6} {'fast us':>10} {'ref us':>12} {'speedup':>10}"
+    )
+    for errors in checks.values():
+        print(errors.row())
+
+    worst = max(checks.values(), key=lambda e: e.max_abs)
+    print(f"\nLargest error: {worst.name}, ${worst.max_abs:.3e} on {worst.worst}")
+    return 1 if worst.max_abs >= HALF_CENT else 0
+
+
+if __name__ == "__main__":
+    args = [int(s) for s in sys.argv[1:]]
+    sys.exit(main(args[0] if args else CASES, args[1] if len(args) > 1 else SEED))
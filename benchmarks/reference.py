@@ -0,0 +1,128 @@
+"""Slow, high-precision reference for the projection engine.
+
+Everything is Decimal at PRECISION significant digits, written the obvious
+way: money moves one paycheck and one interest credit at a time, year by
+year, and limits are applied cell by cell. Paycheck timing is kept as exact
+Fractions. Float inputs convert exactly, so the reference sees the same
+numbers the fast paths do. Nothing here is used by the apps;
+benchmarks/accuracy.py compares the fast paths against it.
+"""
+import math
+import sys
+from decimal import Decimal, localcontext
+from fractions import Fraction
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from contributions import CATCH_UP_AGE, ContributionRules, limits_for_years  # noqa: E402
+from projection import PaySchedule  # noqa: E402
+
+PRECISION = 50
+
+
+def dec(x) -> Decimal:
+    return x if isinstance(x, Decimal) else Decimal(float(x))
+
+
+def precise(func):
+    def wrapper(*args, **kwargs):
+        with localcontext() as ctx:
+            ctx.prec = PRECISION
+            return func(*args, **kwargs)
+
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+def periodic_rate(annual_return, periods: int) -> Decimal:
+    return (1 + dec(annual_return)) ** (Decimal(1) / periods) - 1
+
+
+def _deposit_slots(pay_schedule: PaySchedule) -> List[int]:
+    # The compounding period each paycheck lands in. A paycheck exactly on a
+    # period boundary arrives after that boundary's interest credit.
+    pay, comp = pay_schedule.pay_periods, pay_schedule.compounding_periods
+    ks = range(1, pay + 1) if pay_schedule.timing == "end" else range(pay)
+    return [math.floor(Fraction(k * comp, pay)) for k in ks]
+
+
+def grow_year(balance: Decimal, contribution: Decimal, annual_return, pay_schedule: PaySchedule) -> Decimal:
+    comp = pay_schedule.compounding_periods
+    rate = periodic_rate(annual_return, comp)
+    paycheck = contribution / pay_schedule.pay_periods
+    slots = _deposit_slots(pay_schedule)
+
+    for period in range(comp + 1):
+        balance += paycheck * slots.count(period)
+        if period < comp:
+            balance *= 1 + rate
+    return balance
+
+
+@precise
+def project(balance, contributions: Sequence, annual_returns: Sequence, pay_schedule: PaySchedule) -> List[Decimal]:
+    # Balance at the start and after every year; one return per year.
+    values = [dec(balance)]
+    for contribution, annual_return in zip(contributions, annual_returns):
+        values.append(grow_year(values[-1], dec(contribution), annual_return, pay_schedule))
+    return values
+
+
+def _match(comp: Decimal, deferral_pct: Decimal, rules: ContributionRules) -> Decimal:
+    total, lower = Decimal(0), Decimal(0)
+    for width, rate in rules.match_tiers:
+        width = dec(width)
+        total += min(max(deferral_pct - lower, Decimal(0)), width) * dec(rate)
+        lower += width
+    return comp * total
+
+
+@precise
+def contributions(
+    age: int,
+    salary,
+    years: int,
+    salary_growth,
+    rules: ContributionRules,
+    start_year: int,
+) -> Tuple[List[Decimal], List[Decimal]]:
+    employee_rate, employer_rate = dec(rules.employee_rate), dec(rules.employer_rate)
+    employee, employer = [], []
+    for k in range(years):
+        pay = dec(salary) * (1 + dec(salary_growth)) ** k
+        if not rules.apply_limits:
+            employee.append(pay * employee_rate)
+            employer.append(pay * employer_rate + _match(pay, employee_rate, rules))
+            continue
+
+        deferral_limit, catch_up, additions_limit, comp_limit = (dec(v) for v in limits_for_years(start_year + k))
+        comp = min(pay, comp_limit)
+        allowed = deferral_limit + (catch_up if age + k >= CATCH_UP_AGE else 0)
+        deferred = min(comp * employee_rate, allowed)
+        deferral_pct = deferred / comp if comp > 0 else Decimal(0)
+        matched = comp * employer_rate + _match(comp, deferral_pct, rules)
+        regular = min(deferred, deferral_limit)
+        employee.append(deferred)
+        employer.append(min(matched, max(additions_limit - regular, Decimal(0))))
+    return employee, employer
+
+
+@precise
+def drawdown(balance, withdrawals: Sequence, growth: Sequence) -> List[Decimal]:
+    # Withdraw at the start of the year, grow the rest; empty stays empty.
+    values = [dec(balance)]
+    for withdrawal, factor in zip(withdrawals, growth):
+        values.append(max(values[-1] - dec(withdrawal), Decimal(0)) * dec(factor))
+    return values
+
+
+@precise
+def unit_withdrawal_cost(inflation, growth: Sequence) -> Decimal:
+    # Present value of withdrawing 1 in year one, inflation-adjusted after.
+    cost, prior = Decimal(0), Decimal(1)
+    for t, factor in enumerate(growth):
+        cost += (1 + dec(inflation)) ** t / prior
+        prior *= dec(factor)
+    return cost
@@ -0,0 +1,76 @@
+"""Company typeahead: per-session payload and per-keystroke search latency.
+
+    python benchmarks/typeahead.py [sizes...]
+
+Compares shipping the full company list in a selectbox with sending the
+top matches from CompanyIndex.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+from streamlit.proto.Selectbox_pb2 import Selectbox
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from company_index import CompanyIndex  # noqa: E402
+
+SIZES = (10_000, 100_000, 1_000_000)
+MATCHES = 8
+QUERIES = 500
+
+WORDS = (
+    "acme apex atlas beacon blue cedar summit harbor iron keystone liberty maple meridian north "
+    "oak pioneer prairie river rock silver star sterling union valley west bison eagle granite"
+).split()
+SUFFIXES = ("Inc", "LLC", "Corp", "Group", "Holdings", "Partners", "Co", "Industries")
+
+
+def company_names(n, seed=7):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        names.add(f"{' '.join(words)} {rng.choice(SUFFIXES)} {rng.randint(1, 9999)}")
+    return list(names)
+
+
+def payload_bytes(options):
+    proto = Selectbox()
+    proto.options.extend(options)
+    return proto.ByteSize()
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main(sizes):
+    rng = random.Random(11)
+    print(f"{'companies':>10} {'full list':>12} {'top-k':>8} {'build s':>8} {'p50 us':>8} {'p99 us':>8}")
+    for n in sizes:
+        names = company_names(n)
+
+        start = time.perf_counter()
+        index = CompanyIndex(names)
+        build = time.perf_counter() - start
+
+        latencies = []
+        biggest = 0
+        for name in rng.sample(index.names, QUERIES):
+            for chars in range(2, min(len(name), 10) + 1):
+                start = time.perf_counter()
+                matches = index.search(name[:chars], MATCHES)
+                latencies.append(time.perf_counter() - start)
+                biggest = max(biggest, payload_bytes(matches))
+
+        print(
+            f"{n:>10,} {payload_bytes(index.names):>12,} {biggest:>8,} {build:>8.2f} "
+            f"{percentile(latencies, 0.5) * 1e6:>8.1f} {percentile(latencies, 0.99) * 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(s) for s in sys.argv[1:]] or SIZES)
@@ -0,0 +1,223 @@
+import io
+from typing import Dict, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from company_index import normalize_header
+from contributions import ContributionRules, contribution_schedule
+from projection import DEFAULT_PAY_SCHEDULE, PaySchedule, annual_factors
+from taxes import after_tax_value, roth_contributions
+
+CHUNK_ROWS = 10_000
+PERCENTILES = (10, 25, 50, 75, 90)
+
+CENSUS_COLUMNS = {
+    "age": ("age", "current age"),
+    "salary": ("salary", "annual salary", "current annual salary", "compensation", "annual compensation"),
+    "balance": ("balance", "401k balance", "401 k balance", "account balance", "current 401 k balance"),
+    "retirement_age": ("retirement age", "target age", "target retirement age"),
+}
+REQUIRED_COLUMNS = ("age", "salary", "balance")
+
+
+def _match_columns(headers: Sequence) -> Dict[str, int]:
+    normalized = [normalize_header(h) for h in headers]
+    found = {}
+    for field, aliases in CENSUS_COLUMNS.items():
+        for i, h in enumerate(normalized):
+            if h in aliases:
+                found[field] = i
+                break
+
+    missing = [c for c in REQUIRED_COLUMNS if c not in found]
+    if missing:
+        raise ValueError(f"Census is missing required column(s): {', '.join(missing)}.")
+    return found
+
+
+def _to_numeric(values) -> np.ndarray:
+    s = pd.Series(values, dtype="object").astype(str).str.replace(r"[$,\s]", "", regex=True)
+    return pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+
+
+def _csv_chunks(data: bytes) -> Iterator[pd.DataFrame]:
+    reader = pd.read_csv(io.BytesIO(data), chunksize=CHUNK_ROWS, dtype=str)
+    columns = None
+    for chunk in reader:
+        if columns is None:
+            columns = _match_columns(list(chunk.columns))
+        yield pd.DataFrame({field: _to_numeric(chunk.iloc[:, i]) for field, i in columns.items()})
+
+
+def _xlsx_chunks(data: bytes) -> Iterator[pd.DataFrame]:
+    wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        columns = _match_columns(next(rows, ()))
+
+        buffer = []
+        for row in rows:
+            buffer.append([row[i] if i < len(row) else None for i in columns.values()])
+            if len(buffer) >= CHUNK_ROWS:
+                yield pd.DataFrame({f: _to_numeric(v) for f, v in zip(columns, zip(*buffer))})
+                buffer = []
+        if buffer:
+            yield pd.DataFrame({f: _to_numeric(v) for f, v in zip(columns, zip(*buffer))})
+    finally:
+        wb.close()
+
+
+def read_census(data: bytes, filename: str, default_retirement_age: int) -> pd.DataFrame:
+    chunks = _xlsx_chunks(data) if filename.lower().endswith((".xlsx", ".xlsm")) else _csv_chunks(data)
+    frames = list(chunks)
+    if not frames:
+        raise ValueError("Census has no participant rows.")
+    df = pd.concat(frames, ignore_index=True)
+
+    if "retirement_age" not in df.columns:
+        df["retirement_age"] = np.nan
+    df["retirement_age"] = df["retirement_age"].fillna(default_retirement_age)
+
+    valid = (
+        df["age"].between(0, 120)
+        & (df["salary"] >= 0)
+        & df["balance"].notna()
+        & df["retirement_age"].between(1, 120)
+    )
+    df = df.loc[valid, ["age", "salary", "balance", "retirement_age"]].reset_index(drop=True)
+    # Ages fit in int16; at 50k rows that is a third less memory per cached census.
+    df["age"] = df["age"].astype(np.int16)
+    df["retirement_age"] = df["retirement_age"].astype(np.int16)
+    df.attrs["skipped_rows"] = int((~valid).sum())
+    return df
+
+
+def _census_years(ages: np.ndarray, retirement_ages: np.ndarray) -> np.ndarray:
+    return np.clip(np.asarray(retirement_ages) + 1 - np.asarray(ages), 0, None).astype(int)
+
+
+def _census_chunks(
+    ages: np.ndarray,
+    salaries: np.ndarray,
+    retirement_ages: np.ndarray,
+    salary_growth: float,
+    rules: ContributionRules,
+    start_year: int,
+) -> Iterator[tuple]:
+    # Per chunk of rows: the slice, wages, and employee and employer
+    # contributions by year, zero past each row's own retirement age.
+    years = _census_years(ages, retirement_ages)
+    k = np.arange(int(years.max()) if len(years) else 0)
+    salary_curve = (1.0 + salary_growth) ** k
+
+    for start in range(0, len(years), CHUNK_ROWS):
+        sl = slice(start, start + CHUNK_ROWS)
+        wages = salaries[sl, None] * salary_curve
+        employee, employer = contribution_schedule(wages, ages[sl, None] + k, start_year + k, rules)
+        active = k < years[sl, None]
+        yield sl, wages, np.where(active, employee, 0.0), np.where(active, employer, 0.0)
+
+
+def _census_discount(model_returns: Sequence[float], horizon: int, pay_schedule: PaySchedule):
+    growth, contrib_factor = annual_factors(np.asarray(model_returns, dtype=float), pay_schedule)
+    k = np.arange(horizon)
+    return growth, (growth[:, None] ** -(k + 1.0)) * contrib_factor[:, None]
+
+
+def project_census(
+    ages: np.ndarray,
+    salaries: np.ndarray,
+    balances: np.ndarray,
+    retirement_ages: np.ndarray,
+    salary_growth: float,
+    rules: ContributionRules,
+    model_returns: Sequence[float],
+    start_year: int,
+    pay_schedule: PaySchedule = DEFAULT_PAY_SCHEDULE,
+) -> np.ndarray:
+    # Final balance per participant and model, shape (models, rows). Each row
+    # runs to its own retirement age: contributions past the horizon are masked
+    # to zero and the discounted sums collapse to one matrix product per chunk.
+    years = _census_years(ages, retirement_ages)
+    growth, discount = _census_discount(model_returns, int(years.max()) if len(years) else 0, pay_schedule)
+    compound = growth[:, None] ** years[None, :]
+
+    finals = np.empty((len(growth), len(years)))
+    for sl, _, employee, employer in _census_chunks(ages, salaries, retirement_ages, salary_growth, rules, start_year):
+        finals[:, sl] = compound[:, sl] * (balances[None, sl] + ((employee + employer) @ discount.T).T)
+
+    return finals
+
+
+def project_census_tax(
+    ages: np.ndarray,
+    salaries: np.ndarray,
+    balances: np.ndarray,
+    retirement_ages: np.ndarray,
+    salary_growth: float,
+    rules: ContributionRules,
+    model_returns: Sequence[float],
+    start_year: int,
+    withdrawal_rate: float,
+    filing_status: str,
+    pay_schedule: PaySchedule = DEFAULT_PAY_SCHEDULE,
+) -> np.ndarray:
+    # After-tax value at retirement, shape (2, models, rows): row 0 defers
+    # everything pre-tax, row 1 makes the employee deferrals Roth. Same
+    # chunked pass as project_census, with one more matrix product for the
+    # Roth stream; employer money and existing balances stay pre-tax.
+    years = _census_years(ages, retirement_ages)
+    growth, discount = _census_discount(model_returns, int(years.max()) if len(years) else 0, pay_schedule)
+    compound = growth[:, None] ** years[None, :]
+    k = np.arange(discount.shape[1])
+
+    pretax = np.empty((len(growth), len(years)))
+    employer_only = np.empty_like(pretax)
+    roth = np.empty_like(pretax)
+    for sl, wages, employee, employer in _census_chunks(ages, salaries, retirement_ages, salary_growth, rules, start_year):
+        pretax[:, sl] = compound[:, sl] * (balances[None, sl] + ((employee + employer) @ discount.T).T)
+        employer_only[:, sl] = compound[:, sl] * (balances[None, sl] + (employer @ discount.T).T)
+        roth_employee = roth_contributions(wages, employee, start_year + k, filing_status)
+        roth[:, sl] = compound[:, sl] * (roth_employee @ discount.T).T
+
+    retirement_years = start_year + years[None, :]
+    return np.stack([
+        after_tax_value(pretax, withdrawal_rate, retirement_years, filing_status),
+        after_tax_value(employer_only, withdrawal_rate, retirement_years, filing_status) + roth,
+    ])
+
+
+def summarize(finals: np.ndarray, balances: np.ndarray, names: Sequence[str]) -> pd.DataFrame:
+    pct = np.percentile(finals, PERCENTILES, axis=1) if finals.shape[1] else np.zeros((len(PERCENTILES), len(names)))
+    summary = pd.DataFrame({
+        "Model": list(names),
+        "Participants": finals.shape[1],
+        "Current Total": float(np.sum(balances)),
+        "Projected Total": finals.sum(axis=1),
+        "Projected Mean": finals.mean(axis=1) if finals.shape[1] else 0.0,
+    })
+    for p, row in zip(PERCENTILES, pct):
+        summary[f"P{p}"] = row
+    return summary
+
+
+def census_rows(census: pd.DataFrame, finals: np.ndarray) -> Iterator[tuple]:
+    ages = census["age"].to_numpy()
+    salaries = census["salary"].to_numpy()
+    balances = census["balance"].to_numpy()
+    retirement_ages = census["retirement_age"].to_numpy()
+    for i in range(len(census)):
+        yield (
+            i + 1,
+            int(ages[i]),
+            int(retirement_ages[i]),
+            round(float(salaries[i]), 2),
+            round(float(balances[i]), 2),
+            *(round(float(v), 2) for v in finals[:, i]),
+        )
+
+
+def census_header(names: Sequence[str]) -> tuple:
+    return ("Row", "Age", "Retirement Age", "Salary", "Balance", *(f"Projected {n}" for n in names))
@@ -0,0 +1,105 @@
+import re
+import sys
+from bisect import bisect_left
+from itertools import islice
+from typing import Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+
+def display_name(name: str) -> str:
+    return " ".join(str(name).split()).title()
+
+
+def search_key(text: str) -> str:
+    return " ".join(str(text).split()).casefold()
+
+
+def normalize_header(header) -> str:
+    # Spreadsheet column names compared loosely: case and punctuation ignored.
+    return re.sub(r"[^a-z0-9]+", " ", str(header).lower()).strip()
+
+
+def _prefixed(keys: Sequence[str], prefix: str) -> Iterator[int]:
+    i = bisect_left(keys, prefix)
+    while i < len(keys) and keys[i].startswith(prefix):
+        yield i
+        i += 1
+
+
+class _Suffixes(Sequence):
+    # Sorted view of key[offset:] for (key, offset) pairs, materializing only
+    # the slices a binary search touches.
+
+    def __init__(self, keys: List[str], ids: np.ndarray, offsets: np.ndarray):
+        self.keys = keys
+        self.ids = ids
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, j: int) -> str:
+        return self.keys[self.ids[j]][self.offsets[j]:]
+
+
+class CompanyIndex:
+    # Sorted keys answer prefix queries with a binary search, so a keystroke
+    # costs O(log n + k) however long the company list gets. A second sorted
+    # view holds each name from every later word on, so "widg" also finds
+    # "Acme Widgets"; it stores two int32s per word rather than a string.
+
+    def __init__(self, names: Iterable[str]):
+        # Display names are already whitespace-normalized, so casefold is the
+        # key. Both are interned so other tables keyed by company share them.
+        self.names: List[str] = sorted(
+            {sys.intern(display_name(n)) for n in names if str(n).strip()}, key=str.casefold
+        )
+        self.keys: List[str] = [sys.intern(n.casefold()) for n in self.names]
+
+        ids, offsets = [], []
+        for i, key in enumerate(self.keys):
+            pos = key.find(" ")
+            while pos != -1:
+                ids.append(i)
+                offsets.append(pos + 1)
+                pos = key.find(" ", pos + 1)
+        order = sorted(range(len(ids)), key=lambda j: self.keys[ids[j]][offsets[j]:])
+        self.words = _Suffixes(
+            self.keys,
+            np.asarray(ids, dtype=np.int32)[order],
+            np.asarray(offsets, dtype=np.int32)[order],
+        )
+
+    @classmethod
+    def from_parts(cls, names: Sequence[str], keys: Sequence[str], words: _Suffixes) -> "CompanyIndex":
+        # An index whose sorted columns were built elsewhere, e.g. mapped from
+        # a company store file.
+        index = cls.__new__(cls)
+        index.names, index.keys, index.words = names, keys, words
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        key = search_key(name)
+        i = bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def search(self, query: str, k: int) -> List[str]:
+        # Names starting with the query first, then names with a word that does.
+        prefix = search_key(query)
+        if not prefix or k <= 0:
+            return []
+
+        hits = list(islice(_prefixed(self.keys, prefix), k))
+        seen = set(hits)
+        for j in _prefixed(self.words, prefix):
+            if len(hits) >= k:
+                break
+            i = int(self.words.ids[j])
+            if i not in seen:
+                seen.add(i)
+                hits.append(i)
+        return [self.names[i] for i in hits]
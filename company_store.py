@@ -0,0 +1,215 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+import metrics
+from company_index import CompanyIndex, _Suffixes
+from plans import PlanIndex, read_plan_index
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).resolve().parent
+SOURCE_PATH = APP_DIR / "401k Data.csv"
+# Built by `python company_store.py`; every server process on the host maps
+# the same read-only pages instead of parsing the CSV itself.
+STORE_PATH = Path(os.environ.get("COMPANY_STORE_PATH", APP_DIR / ".cache" / "companies.bin"))
+
+MAGIC = b"COMPANY1"
+FORMAT_VERSION = 1
+ALIGN = 8
+
+
+def _strings(values: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    # UTF-8 blob plus n + 1 byte offsets.
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+class _Strings(Sequence):
+    # Strings decoded on access from an offsets array and a byte blob. UTF-8
+    # byte order is code point order, so a sorted column stays bisectable.
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        # Slicing a memoryview is several times cheaper than slicing an array.
+        self.offsets = offsets
+        self.blob = memoryview(blob)
+        self._len = len(offsets) - 1
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class _PlanRows:
+    # search_key -> plan row, via the company index's sorted keys.
+
+    def __init__(self, keys: Sequence[str], rows: np.ndarray):
+        self.keys = keys
+        self.rows = rows
+
+    def get(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key and self.rows[i] >= 0:
+            return int(self.rows[i])
+        return default
+
+
+def _digest(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+def build(source: Path = SOURCE_PATH, path: Path = STORE_PATH) -> Path:
+    # Parse the CSV once and write every column the apps read. The file is
+    # written beside the target and renamed over it, so a process mapping the
+    # old file keeps reading it and new opens see the complete new one.
+    plans = read_plan_index(source)
+    companies = CompanyIndex(plans.names)
+
+    name_offsets, name_bytes = _strings(companies.names)
+    key_offsets, key_bytes = _strings(companies.keys)
+    formula_offsets, formula_bytes = _strings(plans.match_formulas)
+    columns: Dict[str, np.ndarray] = {
+        "name_offsets": name_offsets,
+        "name_bytes": name_bytes,
+        "key_offsets": key_offsets,
+        "key_bytes": key_bytes,
+        "word_ids": companies.words.ids,
+        "word_offsets": companies.words.offsets,
+        "plan_rows": np.array([plans._rows.get(k, -1) for k in companies.keys], dtype=np.int32),
+        "formula_offsets": formula_offsets,
+        "formula_bytes": formula_bytes,
+        "match_codes": np.asarray(plans.match_codes, dtype=np.int32),
+        "default_deferral": np.asarray(plans.default_deferral, dtype=np.float32),
+        "fund_return": np.asarray(plans.fund_return, dtype=np.float32),
+    }
+
+    sections, offset = {}, 0
+    for name, array in columns.items():
+        sections[name] = [array.dtype.str, offset, len(array)]
+        offset += -(-array.nbytes // ALIGN) * ALIGN
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "source": str(source),
+        "source_sha256": _digest(source),
+        "built_at": time.time(),
+        "companies": len(companies),
+        "sections": sections,
+    }).encode("utf-8")
+    body_start = -(-(len(MAGIC) + 8 + len(header)) // ALIGN) * ALIGN
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(MAGIC)
+            fh.write(np.uint64(len(header)).tobytes())
+            fh.write(header)
+            for name, array in columns.items():
+                fh.seek(body_start + sections[name][1])
+                fh.write(np.ascontiguousarray(array).tobytes())
+            fh.truncate(body_start + offset)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    logger.info("Wrote %s: %d companies from %s", path, len(companies), source)
+    return path
+
+
+class CompanyStore:
+    # Read-only view of a built file. Every column is an ndarray over the
+    # shared mapping, so opening costs no parse and no private copy.
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a company store")
+        size = int(np.frombuffer(self._map, dtype=np.uint64, count=1, offset=len(MAGIC))[0])
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._map[start:start + size].decode("utf-8"))
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path} has format {self.header.get('version')}, expected {FORMAT_VERSION}")
+
+        body_start = -(-(start + size) // ALIGN) * ALIGN
+        col = {
+            name: np.frombuffer(self._map, dtype=np.dtype(dtype), count=count, offset=body_start + offset)
+            for name, (dtype, offset, count) in self.header["sections"].items()
+        }
+
+        keys = _Strings(col["key_offsets"], col["key_bytes"])
+        self.companies = CompanyIndex.from_parts(
+            _Strings(col["name_offsets"], col["name_bytes"]),
+            keys,
+            _Suffixes(keys, col["word_ids"], col["word_offsets"]),
+        )
+        self.plans = PlanIndex.from_parts(
+            self.companies.names,
+            _PlanRows(keys, col["plan_rows"]),
+            list(_Strings(col["formula_offsets"], col["formula_bytes"])),
+            col["match_codes"],
+            col["default_deferral"],
+            col["fund_return"],
+        )
+
+
+_lock = threading.Lock()
+_current: Optional[CompanyStore] = None
+_stamp: Optional[Tuple[int, int, int]] = None
+
+
+def current(path: Path = STORE_PATH) -> Optional[CompanyStore]:
+    # One stat per call; a rebuilt file (new inode) is mapped on the next call
+    # and the old mapping is released once nothing references it. None when
+    # no store has been built.
+    global _current, _stamp
+    try:
+        info = os.stat(path)
+        stamp = (info.st_ino, info.st_mtime_ns, info.st_size)
+    except OSError:
+        stamp = None
+
+    if stamp == _stamp:
+        return _current
+
+    with _lock:
+        if stamp == _stamp:
+            return _current
+        fresh = None
+        if stamp is not None:
+            try:
+                with metrics.timed("company_store.open"):
+                    fresh = CompanyStore(path)
+            except (OSError, ValueError):
+                logger.exception("Could not map company store %s", path)
+                metrics.incr("company_store.open_failed")
+                fresh = _current
+        _current, _stamp = fresh, stamp
+        return _current
+
+
+if __name__ == "__main__":
+    build(Path(sys.argv[1]) if len(sys.argv) > 1 else SOURCE_PATH)
@@ -0,0 +1,108 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+from projection import salary_schedule
+
+LIMITS_PATH = Path(__file__).resolve().parent / "Data" / "irs_limits.csv"
+
+CATCH_UP_AGE = 50
+
+# Years past the table are indexed at this rate and rounded down the way the
+# IRS rounds each limit.
+LIMIT_INDEXING_RATE = 0.025
+LIMIT_ROUNDING = np.array([500.0, 500.0, 1000.0, 5000.0])
+
+_TIER_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*%\s*(?:of\s*(?:the\s*)?(?:first|next)|up\s*to)\s*(\d+(?:\.\d+)?)\s*%",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class ContributionRules:
+    employee_rate: float
+    employer_rate: float = 0.0
+    match_tiers: Tuple[Tuple[float, float], ...] = ()
+    apply_limits: bool = True
+
+
+def parse_match_formula(text: str) -> Tuple[Tuple[float, float], ...]:
+    # "100% of first 3%, 50% of next 2%" -> ((0.03, 1.0), (0.02, 0.5)),
+    # i.e. (band width, match rate) tiers stacked on top of each other.
+    return tuple(
+        (float(band) / 100.0, float(rate) / 100.0)
+        for rate, band in _TIER_PATTERN.findall(text or "")
+    )
+
+
+@lru_cache(maxsize=1)
+def load_limits(path: Path = LIMITS_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    data = np.loadtxt(path, delimiter=",", skiprows=1)
+    return data[:, 0].astype(int), data[:, 1:]
+
+
+def limits_for_years(calendar_years) -> np.ndarray:
+    # Columns: 402(g) deferral, 50+ catch-up, 415(c) annual additions,
+    # 401(a)(17) compensation, one row per calendar year.
+    table_years, table = load_limits()
+    years = np.asarray(calendar_years)
+    idx = np.clip(years - table_years[0], 0, len(table_years) - 1)
+    base = table[idx]
+
+    beyond = np.clip(years - table_years[-1], 0, None)[..., None]
+    indexed = np.floor(base * (1.0 + LIMIT_INDEXING_RATE) ** beyond / LIMIT_ROUNDING) * LIMIT_ROUNDING
+    return np.where(beyond > 0, indexed, base)
+
+
+def contribution_schedule(salaries, ages, calendar_years, rules: ContributionRules) -> Tuple[np.ndarray, np.ndarray]:
+    # Employee and employer dollars for every (participant, year) cell. Inputs
+    # broadcast against each other, so the same code serves a single user's
+    # (years,) path and a census' (rows, years) matrix.
+    salaries = np.asarray(salaries, dtype=float)
+
+    if not rules.apply_limits:
+        return salaries * rules.employee_rate, salaries * rules.employer_rate + _match(salaries, rules.employee_rate, rules)
+
+    limits = limits_for_years(calendar_years)
+    deferral_limit, catch_up, additions_limit, comp_limit = np.moveaxis(limits, -1, 0)
+
+    comp = np.minimum(salaries, comp_limit)
+    catch_up = np.where(np.asarray(ages) >= CATCH_UP_AGE, catch_up, 0.0)
+    employee = np.minimum(comp * rules.employee_rate, deferral_limit + catch_up)
+
+    deferral_pct = np.divide(employee, comp, out=np.zeros_like(employee), where=comp > 0)
+    employer = comp * rules.employer_rate + _match(comp, deferral_pct, rules)
+
+    # Catch-up dollars sit outside 415(c); the employer side is cut back first.
+    regular = employee - np.maximum(employee - deferral_limit, 0.0)
+    employer = np.minimum(employer, np.maximum(additions_limit - regular, 0.0))
+    return employee, employer
+
+
+def _match(comp, deferral_pct, rules: ContributionRules):
+    if not rules.match_tiers:
+        return np.zeros_like(np.asarray(comp, dtype=float))
+
+    widths, rates = np.array(rules.match_tiers).T
+    lowers = np.concatenate(([0.0], np.cumsum(widths)[:-1]))
+    matched = np.clip(np.asarray(deferral_pct, dtype=float)[..., None] - lowers, 0.0, widths)
+    return comp * (matched @ rates)
+
+
+def contribution_paths(
+    age: int,
+    salary: float,
+    years: int,
+    salary_growth: float,
+    rules: ContributionRules,
+    start_year: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    salaries = salary_schedule(salary, years, salary_growth)
+    k = np.arange(years)
+    employee, employer = contribution_schedule(salaries, int(age) + k, int(start_year) + k, rules)
+    return salaries, employee, employer
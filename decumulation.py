@@ -0,0 +1,84 @@
+from typing import Tuple
+
+import numpy as np
+
+DEFAULT_PATHS = 10_000
+DEFAULT_SEED = 2024
+TARGET_SUCCESS = 0.90
+
+
+def withdrawal_schedule(first_year_amount: float, years: int, inflation: float) -> np.ndarray:
+    return float(first_year_amount) * (1.0 + float(inflation)) ** np.arange(years)
+
+
+def deterministic_growth(annual_returns, years: int) -> np.ndarray:
+    return np.repeat(1.0 + np.atleast_1d(np.asarray(annual_returns, dtype=float))[:, None], years, axis=1)
+
+
+def simulate_growth(
+    annual_return: float,
+    volatility: float,
+    years: int,
+    paths: int = DEFAULT_PATHS,
+    seed: int = DEFAULT_SEED,
+) -> np.ndarray:
+    # Lognormal annual growth factors whose median equals the model return.
+    rng = np.random.default_rng(seed)
+    return np.exp(rng.normal(np.log1p(annual_return), volatility, size=(paths, years)))
+
+
+def _discount(growth: np.ndarray) -> np.ndarray:
+    # P_t = product of growth before year t, with P_0 = 1.
+    prior = np.ones_like(growth)
+    np.cumprod(growth[:, :-1], axis=1, out=prior[:, 1:])
+    return prior
+
+
+def drawdown_paths(balance, withdrawals: np.ndarray, growth: np.ndarray) -> np.ndarray:
+    # Withdrawals come out at the start of each year and the rest grows:
+    #   V_{t+1} = P_{t+1} * (B - sum_{k<=t} W_k / P_k)
+    # The bracket only falls, so flooring at zero keeps a depleted path at zero.
+    # balance may be a scalar or one value per path.
+    balance = np.asarray(balance, dtype=float).reshape(-1, 1)
+    prior = _discount(growth)
+    remaining = balance - np.cumsum(withdrawals / prior, axis=1)
+
+    paths = np.empty((growth.shape[0], growth.shape[1] + 1))
+    paths[:, :1] = balance
+    paths[:, 1:] = np.maximum(prior * growth * remaining, 0.0)
+    return paths
+
+
+def depletion_index(paths: np.ndarray) -> np.ndarray:
+    # Years until each path first hits zero, or -1 if it never does.
+    depleted = paths[:, 1:] <= 0.0
+    return np.where(depleted.any(axis=1), depleted.argmax(axis=1) + 1, -1)
+
+
+def unit_withdrawal_cost(inflation: float, growth: np.ndarray) -> np.ndarray:
+    # Discounted cost per path of withdrawing 100% of the starting balance in
+    # year one, inflation-adjusted after that. The problem is scale-free: a path
+    # survives a rate when rate * cost < 1.
+    return np.sum(withdrawal_schedule(1.0, growth.shape[1], inflation) / _discount(growth), axis=1)
+
+
+def success_rate(rate: float, unit_cost: np.ndarray) -> float:
+    return float(np.mean(rate * unit_cost < 1.0))
+
+
+def solve_withdrawal_rate(
+    inflation: float,
+    growth: np.ndarray,
+    target_success: float = TARGET_SUCCESS,
+    tol: float = 1e-5,
+) -> Tuple[float, float]:
+    # Bisection on the initial withdrawal rate; every step tests all paths at once.
+    unit_cost = unit_withdrawal_cost(inflation, growth)
+    lo, hi = 0.0, 1.0
+    while hi - lo > tol:
+        mid = 0.5 * (lo + hi)
+        if success_rate(mid, unit_cost) >= target_success:
+            lo = mid
+        else:
+            hi = mid
+    return lo, success_rate(lo, unit_cost)
@@ -0,0 +1,87 @@
+import codecs
+import csv
+import io
+from typing import Callable, Dict, Iterable, Iterator, Sequence
+
+from openpyxl import Workbook
+
+from contributions import ContributionRules, contribution_paths
+from projection import DEFAULT_PAY_SCHEDULE, PaySchedule, project_matrix
+
+SCHEDULE_HEADER = (
+    "Model",
+    "Year",
+    "Age",
+    "Salary",
+    "Employee Contribution",
+    "Employer Contribution",
+    "Growth",
+    "Ending Balance",
+)
+
+EXPORT_MIME = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def schedule_rows(
+    age: int,
+    salary: float,
+    balance: float,
+    years: int,
+    salary_growth: float,
+    rules: ContributionRules,
+    models: Dict[str, float],
+    start_year: int,
+    pay_schedule: PaySchedule = DEFAULT_PAY_SCHEDULE,
+) -> Iterator[tuple]:
+    salaries, employee, employer = contribution_paths(age, salary, years, salary_growth, rules, start_year)
+    contribs = employee + employer
+
+    # One model at a time so a long model list never holds more than one path.
+    for name, annual_return in models.items():
+        values = project_matrix(balance, contribs, (annual_return,), pay_schedule)[0]
+        growth = values[1:] - values[:-1] - contribs
+
+        for k in range(years):
+            yield (
+                name,
+                k + 1,
+                int(age) + k + 1,
+                round(float(salaries[k]), 2),
+                round(float(employee[k]), 2),
+                round(float(employer[k]), 2),
+                round(float(growth[k]), 2),
+                round(float(values[k + 1]), 2),
+            )
+
+
+def write_csv(rows: Iterable[Sequence], fh, header: Sequence[str] = SCHEDULE_HEADER) -> None:
+    text = codecs.getwriter("utf-8")(fh)
+    writer = csv.writer(text)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+
+
+def write_xlsx(rows: Iterable[Sequence], fh, header: Sequence[str] = SCHEDULE_HEADER, title: str = "Schedule") -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(list(header))
+    for row in rows:
+        ws.append(list(row))
+    wb.save(fh)
+
+
+def export_file(rows_factory: Callable[[], Iterable[Sequence]], fmt: str, header: Sequence[str] = SCHEDULE_HEADER) -> io.BytesIO:
+    # The buffer itself, which st.download_button's deferred data callable may
+    # return and Streamlit reads with a single getvalue(). Rows stream from the
+    # generator, but the finished file is held in memory once: Streamlit keeps
+    # every download as bytes, so memory grows with the census, not constant.
+    fh = io.BytesIO()
+    if fmt == "xlsx":
+        write_xlsx(rows_factory(), fh, header)
+    else:
+        write_csv(rows_factory(), fh, header)
+    return fh
@@ -0,0 +1,76 @@
+import dataclasses
+import os
+import resource
+import sys
+from collections import defaultdict
+from typing import Any, Dict, Mapping, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+
+def rss_bytes() -> int:
+    # Current resident set size; falls back to the peak where /proc is missing.
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    # Bytes reachable from obj, counting shared objects (interned strings,
+    # array views) once.
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) if obj.base is None else sys.getsizeof(obj) + deep_sizeof(obj.base, seen)
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        size += sum(deep_sizeof(getattr(obj, f.name), seen) for f in dataclasses.fields(obj))
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+def data_cache_bytes() -> Dict[str, int]:
+    # Serialized size of every st.cache_data function's entries.
+    from streamlit.runtime.caching import get_data_cache_stats_provider
+
+    stats = get_data_cache_stats_provider().get_stats()
+    if isinstance(stats, Mapping):
+        stats = [stat for family in stats.values() for stat in family]
+
+    out: Dict[str, int] = defaultdict(int)
+    for stat in stats:
+        out[stat.cache_name.rpartition(".")[2]] += stat.byte_length
+    return dict(sorted(out.items()))
+
+
+def session_bytes(state: Mapping[str, Any]) -> Dict[str, int]:
+    seen: Set[int] = set()
+    out = {str(key): deep_sizeof(state[key], seen) for key in list(state.keys())}
+    return dict(sorted(out.items(), key=lambda kv: -kv[1]))
+
+
+def report(state: Mapping[str, Any], resources: Mapping[str, Any]) -> Dict[str, Any]:
+    session = session_bytes(state)
+    return {
+        "rss_bytes": rss_bytes(),
+        "data_cache_bytes": data_cache_bytes(),
+        "resource_bytes": {name: deep_sizeof(value) for name, value in resources.items()},
+        "session_bytes": sum(session.values()),
+        "session_keys": session,
+    }
@@ -0,0 +1,44 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, float] = defaultdict(float)
+
+
+def incr(name: str, amount: float = 1) -> None:
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot(prefix: str = "") -> Dict[str, float]:
+    with _lock:
+        return {k: v for k, v in sorted(_counters.items()) if k.startswith(prefix)}
+
+
+def ratio(numerator: str, denominator: str) -> float:
+    with _lock:
+        den = _counters.get(denominator, 0)
+        return _counters.get(numerator, 0) / den if den else 0.0
+
+
+def observe(name: str, seconds: float) -> None:
+    with _lock:
+        _counters[f"{name}.calls"] += 1
+        _counters[f"{name}.seconds"] += seconds
+
+
+@contextmanager
+def timed(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
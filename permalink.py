@@ -0,0 +1,63 @@
+import base64
+import binascii
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+import metrics
+import projection_cache
+
+# ?s=<scenario>&k=<cache key>. The scenario is deflated JSON in URL-safe
+# base64; the key is the persistent cache key of the projection the chart
+# draws, so an open can go straight to the stored result.
+SCENARIO_PARAM = "s"
+KEY_PARAM = "k"
+FORMAT_VERSION = 1
+
+# Persistent-cache stats name for permalink opens, kept apart from the
+# computing functions' own hits and misses.
+STATS_NAME = "permalink"
+
+# Scenarios are a few hundred bytes; anything much larger is not ours.
+MAX_TOKEN_CHARS = 2048
+MAX_SCENARIO_BYTES = 16 * 1024
+
+
+def encode(scenario: Dict[str, Any]) -> str:
+    raw = json.dumps([FORMAT_VERSION, scenario], sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(zlib.compress(raw, 9)).rstrip(b"=").decode("ascii")
+
+
+def decode(token: str) -> Dict[str, Any]:
+    # ValueError for anything encode() could not have produced.
+    if len(token) > MAX_TOKEN_CHARS:
+        raise ValueError("Permalink is too long.")
+    try:
+        packed = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        inflater = zlib.decompressobj()
+        raw = inflater.decompress(packed, MAX_SCENARIO_BYTES)
+        version, scenario = json.loads(raw) if not inflater.unconsumed_tail else (None, None)
+    # RecursionError: a few dozen bytes inflate to thousands of nested "[".
+    except (binascii.Error, zlib.error, UnicodeDecodeError, TypeError, ValueError, RecursionError) as e:
+        raise ValueError("Permalink is not a scenario.") from e
+    if version != FORMAT_VERSION or not isinstance(scenario, dict):
+        raise ValueError("Permalink is not a scenario.")
+    return scenario
+
+
+def params(scenario: Dict[str, Any], key: str) -> Dict[str, str]:
+    return {SCENARIO_PARAM: encode(scenario), KEY_PARAM: key}
+
+
+def cached(key: str, linked_key: str) -> Optional[np.ndarray]:
+    # The stored projection for an opened link, or None to compute as usual.
+    # A scenario that hashes to a different key today (new engine, assumptions
+    # or plan data) is stale: its inputs still open, its numbers are redone.
+    metrics.incr("permalink.opened")
+    if key != linked_key:
+        metrics.incr("permalink.stale")
+        return None
+    value = projection_cache.get(key, STATS_NAME)
+    return value if isinstance(value, np.ndarray) else None
@@ -0,0 +1,121 @@
+import dataclasses
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from company_index import display_name, normalize_header, search_key
+from contributions import ContributionRules, parse_match_formula
+
+PLAN_COLUMNS = {
+    "company": ("company name", "company", "employer", "plan sponsor"),
+    "match_formula": ("match formula", "employer match", "match", "matching formula"),
+    "default_deferral": ("default deferral", "default deferral rate", "auto enroll rate", "default contribution"),
+    "fund_return": ("fund return", "fund lineup return", "lineup return", "expected return"),
+}
+
+
+def _to_rate(values: pd.Series) -> np.ndarray:
+    # A "%" always means percent. Without one, values of 1 or more are
+    # percentages and values below 1 are fractions: "6%", "6" and "0.06" are
+    # all six percent, "1" and "1.0" are one percent, and "0.5" is fifty.
+    text = values.astype(str)
+    numbers = pd.to_numeric(text.str.replace(r"[%$,\s]", "", regex=True), errors="coerce").to_numpy(dtype=float)
+    percent = text.str.contains("%", regex=False).to_numpy() | (numbers >= 1.0)
+    return np.where(percent, numbers / 100.0, numbers).round(6)
+
+
+@dataclass(frozen=True)
+class PlanTerms:
+    match_formula: str
+    employee_rate: Optional[float]
+    fund_return: Optional[float]
+
+    def contribution_rules(self, default: ContributionRules) -> ContributionRules:
+        # The plan's match replaces the flat employer rate; missing terms fall
+        # back to the default.
+        tiers = parse_match_formula(self.match_formula)
+        return dataclasses.replace(
+            default,
+            employee_rate=default.employee_rate if self.employee_rate is None else self.employee_rate,
+            employer_rate=0.0 if tiers else default.employer_rate,
+            match_tiers=tiers or default.match_tiers,
+        )
+
+
+class PlanIndex:
+    # Plan terms for every company, column-wise: match formulas as categorical
+    # codes, rates as float32 with NaN for unknown. A dict from the normalized
+    # name to the row makes each lookup O(1).
+
+    def __init__(self, table: pd.DataFrame):
+        table = table.assign(company=table["company"].map(display_name))
+        table = table.groupby(table["company"].map(search_key), sort=False).first()
+
+        self.names: List[str] = [sys.intern(n) for n in table["company"]]
+        self._rows: Dict[str, int] = {sys.intern(key): i for i, key in enumerate(table.index)}
+
+        formulas = pd.Categorical(table["match_formula"].fillna("").astype(str).str.strip())
+        self.match_formulas: List[str] = list(formulas.categories)
+        self.match_codes: np.ndarray = formulas.codes
+        self.default_deferral: np.ndarray = table["default_deferral"].to_numpy(dtype=np.float32)
+        self.fund_return: np.ndarray = table["fund_return"].to_numpy(dtype=np.float32)
+
+    @classmethod
+    def from_parts(
+        cls,
+        names: Sequence[str],
+        rows: Mapping[str, int],
+        match_formulas: List[str],
+        match_codes: np.ndarray,
+        default_deferral: np.ndarray,
+        fund_return: np.ndarray,
+    ) -> "PlanIndex":
+        # Columns built elsewhere; `rows` only needs .get(search_key).
+        index = cls.__new__(cls)
+        index.names, index._rows = names, rows
+        index.match_formulas, index.match_codes = match_formulas, match_codes
+        index.default_deferral, index.fund_return = default_deferral, fund_return
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, company: str) -> Optional[PlanTerms]:
+        row = self._rows.get(search_key(company))
+        if row is None:
+            return None
+
+        code = self.match_codes[row]
+        deferral = self.default_deferral[row]
+        fund_return = self.fund_return[row]
+        terms = PlanTerms(
+            match_formula=self.match_formulas[code] if code >= 0 else "",
+            employee_rate=None if np.isnan(deferral) else round(float(deferral), 6),
+            fund_return=None if np.isnan(fund_return) else round(float(fund_return), 6),
+        )
+        return terms if terms != PlanTerms("", None, None) else None
+
+
+def read_plan_index(path: Path) -> PlanIndex:
+    # Company names are required; plan term columns are optional.
+    columns = {field: pd.Series(dtype=object) for field in PLAN_COLUMNS}
+    if path.exists():
+        df = pd.read_csv(path, dtype=str)
+        headers = {normalize_header(h): h for h in df.columns}
+        for field, aliases in PLAN_COLUMNS.items():
+            match = next((headers[a] for a in aliases if a in headers), None)
+            if match is not None:
+                columns[field] = df[match]
+
+    company = columns["company"].dropna().astype(str).str.strip()
+    company = company[company != ""]
+    return PlanIndex(pd.DataFrame({
+        "company": company,
+        "match_formula": columns["match_formula"].reindex(company.index),
+        "default_deferral": _to_rate(columns["default_deferral"].reindex(company.index)),
+        "fund_return": _to_rate(columns["fund_return"].reindex(company.index)),
+    }))
@@ -0,0 +1,104 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+import numpy as np
+
+PERIODS_PER_YEAR = 24
+
+PAY_FREQUENCIES = {
+    "Weekly": 52,
+    "Biweekly": 26,
+    "Semimonthly": 24,
+    "Monthly": 12,
+}
+
+COMPOUNDING_FREQUENCIES = {
+    "Daily": 365,
+    "Weekly": 52,
+    "Biweekly": 26,
+    "Semimonthly": 24,
+    "Monthly": 12,
+    "Quarterly": 4,
+    "Annually": 1,
+}
+
+
+def parse_model_list(text: str) -> Dict[str, float]:
+    models = {}
+    for line in (text or "").splitlines():
+        name, sep, rate = line.rpartition(":") if ":" in line else line.rpartition(",")
+        name = name.strip()
+        if not sep or not name:
+            continue
+        try:
+            models[name] = float(rate.replace("%", "").strip()) / 100.0
+        except ValueError:
+            continue
+    return models
+
+
+@dataclass(frozen=True)
+class PaySchedule:
+    pay_periods: int = PERIODS_PER_YEAR
+    compounding_periods: int = PERIODS_PER_YEAR
+    timing: str = "end"
+
+
+DEFAULT_PAY_SCHEDULE = PaySchedule()
+
+
+def contribution_exponents(pay_schedule: PaySchedule) -> np.ndarray:
+    # Compounding credits left in the year after each paycheck. Interest is
+    # credited at the end of each compounding period on the balance held at
+    # that moment, so a deposit at time x (in compounding periods) sees
+    # C - floor(x) credits.
+    pay, comp = int(pay_schedule.pay_periods), int(pay_schedule.compounding_periods)
+    k = np.arange(1, pay + 1) if pay_schedule.timing == "end" else np.arange(pay)
+    return comp - (k * comp) // pay
+
+
+def annual_factors(annual_returns, pay_schedule: PaySchedule = DEFAULT_PAY_SCHEDULE) -> Tuple[np.ndarray, np.ndarray]:
+    # Growth of a dollar over a year and the year-end value of one dollar of
+    # annual contributions spread over the paychecks. Both are closed form in
+    # the rates; the cost depends only on the pay frequency.
+    r = np.asarray(annual_returns, dtype=float)
+    comp = int(pay_schedule.compounding_periods)
+    per_rate = (1.0 + r) ** (1.0 / comp) - 1.0
+    growth = (1.0 + per_rate) ** comp
+
+    if pay_schedule.pay_periods == comp:
+        # Even paychecks on the compounding dates: a geometric series.
+        safe_rate = np.where(per_rate == 0, 1.0, per_rate)
+        annuity = np.where(per_rate == 0, comp, (growth - 1.0) / safe_rate)
+        if pay_schedule.timing != "end":
+            annuity = annuity * (1.0 + per_rate)
+        return growth, annuity / comp
+
+    exponents = contribution_exponents(pay_schedule)
+    contrib_factor = np.mean((1.0 + per_rate[..., None]) ** exponents, axis=-1)
+    return growth, contrib_factor
+
+
+def salary_schedule(salary: float, years: int, growth_rate: float) -> np.ndarray:
+    return float(salary) * (1.0 + float(growth_rate)) ** np.arange(years)
+
+
+def project_matrix(
+    balance: float,
+    annual_contribs,
+    annual_returns,
+    pay_schedule: PaySchedule = DEFAULT_PAY_SCHEDULE,
+) -> np.ndarray:
+    # Balance after year t for every model at once:
+    #   V_t = g^t * (B + sum_{k<t} c_k * f / g^(k+1))
+    # where g is the annual growth factor and f spreads c_k over the pay periods.
+    growth, contrib_factor = annual_factors(np.atleast_1d(annual_returns), pay_schedule)
+    contribs = np.asarray(annual_contribs, dtype=float)
+    years = contribs.shape[-1]
+
+    powers = growth[:, None] ** np.arange(years + 1)
+    discounted = contribs[None, :] * contrib_factor[:, None] / powers[:, 1:]
+
+    accumulated = np.zeros_like(powers)
+    np.cumsum(discounted, axis=1, out=accumulated[:, 1:])
+    return powers * (float(balance) + accumulated)
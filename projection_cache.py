@@ -0,0 +1,335 @@
+import atexit
+import dataclasses
+import functools
+import hashlib
+import inspect
+import itertools
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).resolve().parent
+CACHE_PATH = Path(os.environ.get("PROJECTION_CACHE_PATH", APP_DIR / ".cache" / "projections.sqlite"))
+MAX_BYTES = int(os.environ.get("PROJECTION_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# The size check runs every EVICT_CHECK_EVERY puts per process, and eviction
+# trims down to this share of MAX_BYTES so it doesn't run again right away.
+LOW_WATERMARK = 0.9
+EVICT_CHECK_EVERY = 32
+# Hits only move an entry's LRU time once it is this stale, so most hits
+# are a single read.
+ACCESS_RESOLUTION = 60.0
+# Hit/miss counts are kept in process and written in one statement every
+# STATS_FLUSH_EVENTS lookups or STATS_FLUSH_SECONDS, whichever comes first.
+STATS_FLUSH_EVENTS = 100
+STATS_FLUSH_SECONDS = 10.0
+
+# Anything that changes the numbers a projection produces.
+ENGINE_SOURCES = (
+    APP_DIR / "projection.py",
+    APP_DIR / "contributions.py",
+    APP_DIR / "Data" / "irs_limits.csv",
+    APP_DIR / "taxes.py",
+    APP_DIR / "Data" / "tax_brackets.csv",
+)
+
+_MISSING = object()
+_local = threading.local()
+_disabled = False
+_put_count = itertools.count()
+
+_stats_lock = threading.Lock()
+_pending_stats: Dict[str, List[int]] = {}
+_pending_events = 0
+_last_flush = time.monotonic()
+
+
+def _file_digest(paths: Sequence[Path]) -> str:
+    h = hashlib.sha256()
+    for path in paths:
+        try:
+            h.update(path.read_bytes())
+        except OSError:
+            h.update(str(path).encode("utf-8"))
+    return h.hexdigest()
+
+
+# Bump when stored values change meaning without any hashed source changing
+# (e.g. the pickling of a dependency); edits to cached functions, the engine
+# modules and their tables are picked up on their own.
+CACHE_SCHEMA = 2
+ENGINE_VERSION = f"{CACHE_SCHEMA}:{_file_digest(ENGINE_SOURCES)}"
+
+
+def _source(obj) -> str:
+    # Source text of a function (through st.cache_data and other wrappers),
+    # so editing its body gives it a new cache version.
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}"
+
+
+def _canonical(obj):
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {"__dataclass__": type(obj).__name__, **_canonical(dataclasses.asdict(obj))}
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in sorted(obj.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _canonical(obj.tolist())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, float):
+        return repr(obj)
+    return obj
+
+
+def tag(kind: str, value: Any) -> str:
+    # Labels an entry with an input it was computed from, e.g. one model's
+    # return, so a config change can drop just those entries.
+    if isinstance(value, (float, np.floating)):
+        value = repr(float(value))
+    return f"{kind}:{value}"
+
+
+def cache_key(name: str, version: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        [name, version, _canonical(args), _canonical(kwargs)],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    global _disabled
+    if _disabled:
+        return None
+
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, fn TEXT NOT NULL,"
+            " value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tags ("
+            " tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tags_key ON tags (key)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stats ("
+            " fn TEXT PRIMARY KEY, hits INTEGER NOT NULL DEFAULT 0, misses INTEGER NOT NULL DEFAULT 0)"
+        )
+    except sqlite3.Error:
+        logger.exception("Persistent projection cache unavailable at %s", CACHE_PATH)
+        _disabled = True
+        return None
+
+    _local.conn = conn
+    return conn
+
+
+def _record(name: str, outcome: str) -> None:
+    global _pending_events
+    metrics.incr(f"cache.{name}.{outcome}")
+    with _stats_lock:
+        _pending_stats.setdefault(name, [0, 0])[outcome != "hit"] += 1
+        _pending_events += 1
+        due = _pending_events >= STATS_FLUSH_EVENTS or time.monotonic() - _last_flush >= STATS_FLUSH_SECONDS
+    if due:
+        _flush_stats()
+
+
+def _flush_stats() -> None:
+    global _pending_stats, _pending_events, _last_flush
+    with _stats_lock:
+        pending, _pending_stats = _pending_stats, {}
+        _pending_events, _last_flush = 0, time.monotonic()
+    conn = _connect() if pending else None
+    if conn is None:
+        return
+
+    try:
+        conn.executemany(
+            "INSERT INTO stats (fn, hits, misses) VALUES (?, ?, ?) "
+            "ON CONFLICT(fn) DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+            [(fn, hits, misses) for fn, (hits, misses) in pending.items()],
+        )
+    except sqlite3.Error:
+        logger.exception("Persistent cache stats write failed")
+
+
+atexit.register(_flush_stats)
+
+
+def get(key: str, name: str):
+    conn = _connect()
+    if conn is None:
+        return _MISSING
+
+    try:
+        row = conn.execute("SELECT value, accessed FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            _record(name, "miss")
+            return _MISSING
+        now = time.time()
+        if now - row[1] >= ACCESS_RESOLUTION:
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        _record(name, "hit")
+        return pickle.loads(row[0])
+    except (sqlite3.Error, pickle.UnpicklingError):
+        logger.exception("Persistent cache read failed")
+        return _MISSING
+
+
+def contains(key: str) -> bool:
+    # Existence only: no unpickling, no hit/miss accounting.
+    conn = _connect()
+    if conn is None:
+        return False
+
+    try:
+        return conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone() is not None
+    except sqlite3.Error:
+        logger.exception("Persistent cache read failed")
+        return False
+
+
+def put(key: str, name: str, value, tags: Iterable[str] = ()) -> None:
+    conn = _connect()
+    if conn is None:
+        return
+
+    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT OR REPLACE INTO entries (key, fn, value, size, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, name, blob, len(blob), time.time()),
+        )
+        conn.executemany("INSERT OR IGNORE INTO tags (tag, key) VALUES (?, ?)", [(t, key) for t in tags])
+        conn.execute("COMMIT")
+        if next(_put_count) % EVICT_CHECK_EVERY == 0:
+            _evict(conn)
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        logger.exception("Persistent cache write failed")
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    if total <= MAX_BYTES:
+        return
+
+    target = total - int(MAX_BYTES * LOW_WATERMARK)
+    freed = 0
+    evicted = 0
+    for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+        if freed >= target:
+            break
+        conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+        conn.execute("DELETE FROM tags WHERE key = ?", (key,))
+        freed += size
+        evicted += 1
+    metrics.incr("cache.evicted", evicted)
+
+
+def invalidate(tags: Iterable[str]) -> int:
+    conn = _connect()
+    if conn is None:
+        return 0
+
+    tags = list(tags)
+    if not tags:
+        return 0
+
+    marks = ",".join("?" * len(tags))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        keys = conn.execute(f"SELECT DISTINCT key FROM tags WHERE tag IN ({marks})", tags).fetchall()
+        conn.executemany("DELETE FROM entries WHERE key = ?", keys)
+        conn.executemany("DELETE FROM tags WHERE key = ?", keys)
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        logger.exception("Persistent cache invalidation failed")
+        return 0
+
+    metrics.incr("cache.invalidated", len(keys))
+    logger.info("Invalidated %d cached projections for %s", len(keys), tags)
+    return len(keys)
+
+
+def stats() -> Dict[str, Dict[str, float]]:
+    _flush_stats()
+    conn = _connect()
+    if conn is None:
+        return {}
+
+    out = {}
+    for fn, hits, misses in conn.execute("SELECT fn, hits, misses FROM stats ORDER BY fn"):
+        total = hits + misses
+        out[fn] = {"hits": hits, "misses": misses, "hit_ratio": hits / total if total else 0.0}
+
+    size, count = conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries").fetchone()
+    out["_store"] = {"entries": count, "bytes": size, "max_bytes": MAX_BYTES}
+    return out
+
+
+def persistent_cache(
+    name: str,
+    depends: Sequence[Any] = (),
+    tags: Optional[Callable[..., Iterable[str]]] = None,
+) -> Callable:
+    # Second-level cache behind st.cache_data: survives restarts and is shared
+    # by every process on the host. Entries are versioned by the engine
+    # sources and by the function's own source. `depends` lists what else it
+    # reads outside the engine: constants by value, helper functions by
+    # source. `tags` maps a call's arguments to labels that invalidate() can
+    # target.
+    def decorator(func):
+        code = [_source(func)] + [_source(d) for d in depends if callable(d)]
+        values = tuple(d for d in depends if not callable(d))
+        version = cache_key(name, ENGINE_VERSION, (values, code), {})
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(name, version, args, kwargs)
+            value = get(key, name)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                put(key, name, value, tags(*args, **kwargs) if tags else ())
+            return value
+
+        # The key a call is stored under, without looking it up; permalinks
+        # carry it.
+        wrapper.key = lambda *args, **kwargs: cache_key(name, version, args, kwargs)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,209 @@
+import logging
+import multiprocessing
+import os
+import textwrap
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from datetime import date
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import metrics
+import projection_cache
+
+logger = logging.getLogger(__name__)
+
+REPORT_MIME = {
+    "pdf": "application/pdf",
+    "png": "image/png",
+}
+
+# Reports outlive restarts in the persistent cache, so their keys carry the
+# layout code below and the caller's figure code. Bump for changes no hashed
+# source reflects, such as fonts or the kaleido/Chrome export.
+REPORT_SCHEMA = 1
+
+# Each worker holds a headless browser for the static export, so the pool is
+# small; past MAX_PENDING queued reports new requests are turned away.
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", 2))
+MAX_PENDING = int(os.environ.get("REPORT_MAX_PENDING", 8))
+
+FONT_PATH = Path(__file__).resolve().parent / "Fonts" / "Urbanist-VariableFont_wght.ttf"
+
+# US Letter at 150 dpi.
+DPI = 150
+PAGE = (1275, 1650)
+MARGIN = 75
+CHART_SIZE = (1100, 500)
+ROW_HEIGHT = 28
+TEXT = (17, 24, 39)
+MUTED = (107, 114, 128)
+RULE = (229, 231, 235)
+
+
+def _font(size: int):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype(str(FONT_PATH), size)
+    except OSError:
+        return ImageFont.load_default(size)
+
+
+def _cell(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+    return str(value)
+
+
+def _table_pages(header: Sequence[str], rows: List[Sequence[Any]]):
+    # The first column is a label, left-aligned and twice as wide; the rest
+    # are right-aligned numbers under headers wrapped one word per line.
+    from PIL import Image, ImageDraw
+
+    font = _font(17)
+    width = PAGE[0] - 2 * MARGIN
+    unit = width / (len(header) + 1)
+    edges = [MARGIN + unit * (i + 2) for i in range(len(header))]
+    lines = max(len(str(h).split()) for h in header)
+    per_page = (PAGE[1] - 2 * MARGIN) // ROW_HEIGHT - lines
+
+    def put(draw, i, y, text, font, fill):
+        if i == 0:
+            draw.text((MARGIN, y), text, font=font, fill=fill)
+        else:
+            draw.text((edges[i] - 8, y), text, font=font, fill=fill, anchor="ra")
+
+    for start in range(0, max(len(rows), 1), per_page):
+        page = Image.new("RGB", PAGE, "white")
+        draw = ImageDraw.Draw(page)
+        for i, text in enumerate(header):
+            words = str(text).split()
+            for j, word in enumerate(words):
+                put(draw, i, MARGIN + (lines - len(words) + j) * ROW_HEIGHT, word, font, MUTED)
+        y = MARGIN + lines * ROW_HEIGHT
+        draw.line((MARGIN, y - 4, MARGIN + width, y - 4), fill=RULE, width=2)
+        for row in rows[start:start + per_page]:
+            for i, value in enumerate(row):
+                put(draw, i, y, _cell(value), font, TEXT)
+            y += ROW_HEIGHT
+        yield page
+
+
+def render(spec: Dict[str, Any]) -> Dict[str, Any]:
+    # Runs in a pool worker: exports the chart through plotly's static image
+    # export (kaleido) and lays the report out with Pillow.
+    import plotly.io as pio
+    from PIL import Image, ImageDraw
+
+    started = time.perf_counter()
+    fig = pio.from_json(spec["figure"])
+    png = fig.to_image(format="png", width=CHART_SIZE[0], height=CHART_SIZE[1], scale=2)
+
+    if spec["fmt"] == "png":
+        return {"data": png, "seconds": time.perf_counter() - started}
+
+    first = Image.new("RGB", PAGE, "white")
+    draw = ImageDraw.Draw(first)
+    y = MARGIN
+    draw.text((MARGIN, y), spec["title"], font=_font(40), fill=TEXT)
+    y += 56
+    draw.text((MARGIN, y), f"Prepared {date.today():%B %d, %Y}", font=_font(20), fill=MUTED)
+    y += 48
+
+    chart = Image.open(BytesIO(png)).convert("RGB")
+    width = PAGE[0] - 2 * MARGIN
+    chart = chart.resize((width, round(chart.height * width / chart.width)), Image.LANCZOS)
+    first.paste(chart, (MARGIN, y))
+    y += chart.height + 36
+
+    caption = _font(20)
+    for line in textwrap.wrap(spec["caption"], width=110):
+        draw.text((MARGIN, y), line, font=caption, fill=MUTED)
+        y += 28
+
+    pages = list(_table_pages(spec["header"], spec["rows"]))
+    out = BytesIO()
+    first.save(out, "PDF", resolution=DPI, save_all=True, append_images=pages)
+    return {"data": out.getvalue(), "seconds": time.perf_counter() - started}
+
+
+@lru_cache(maxsize=None)
+def report_version(*figure_code) -> str:
+    # Like persistent_cache's version: the engine, the schema and the source
+    # of this module's layout plus whatever code draws the chart and table.
+    code = [projection_cache._source(f) for f in (render, _table_pages, _font, _cell, *figure_code)]
+    return projection_cache.cache_key("report", projection_cache.ENGINE_VERSION, (REPORT_SCHEMA, code), {})
+
+
+def report_key(fmt: str, inputs: Sequence[Any], version: str) -> str:
+    # Same inputs and code, same report: the key covers everything the chart,
+    # caption and table are drawn from.
+    return projection_cache.cache_key("report", version, (fmt, *inputs), {})
+
+
+class ReportPool:
+    # Renders off the Streamlit thread in a bounded process pool. Finished
+    # reports go to the persistent cache, so identical requests from any
+    # session or process are served without rendering again.
+
+    def __init__(self, workers: int = REPORT_WORKERS, max_pending: int = MAX_PENDING):
+        # Spawned, not forked: the server process has threads and sockets.
+        self._executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Future] = {}
+
+    def status(self, key: str) -> Optional[str]:
+        # "ready", "pending", "failed", or None if never requested.
+        # A finished job stays pending until its callback has stored the result.
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is not None:
+            return "failed" if job.done() and job.exception() is not None else "pending"
+        return "ready" if projection_cache.contains(key) else None
+
+    def error(self, key: str) -> Optional[str]:
+        # Why the last attempt failed, on one line, e.g. kaleido finding no
+        # Chrome to export with; None unless the key's status is "failed".
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None or not job.done() or job.exception() is None:
+            return None
+        error = job.exception()
+        return " ".join(str(error).split()) or type(error).__name__
+
+    def submit(self, key: str, spec: Dict[str, Any], tags: Iterable[str] = ()) -> bool:
+        # False when the queue is full. Resubmitting a pending key is a no-op.
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.done():
+                return True
+            if sum(not j.done() for j in self._jobs.values()) >= self._max_pending:
+                metrics.incr("report.rejected")
+                return False
+            job = self._executor.submit(render, spec)
+            self._jobs[key] = job
+        metrics.incr("report.submitted")
+        tags = list(tags)
+        job.add_done_callback(lambda done: self._finished(key, done, tags))
+        return True
+
+    def _finished(self, key: str, job: Future, tags: List[str]) -> None:
+        try:
+            result = job.result()
+        except Exception:
+            metrics.incr("report.failed")
+            logger.exception("Report %s failed to render", key[:12])
+            return
+        metrics.observe("report.render", result["seconds"])
+        projection_cache.put(key, "report", result["data"], tags)
+        with self._lock:
+            self._jobs.pop(key, None)
+
+    def get(self, key: str) -> Optional[bytes]:
+        data = projection_cache.get(key, "report")
+        return data if isinstance(data, bytes) else None
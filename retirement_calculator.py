@@ -1,10 +1,30 @@
 import streamlit as st
-import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-from datetime import datetime
 from supabase import create_client, Client
 from pathlib import Path
 import base64
+import logging
+import math
+import time
+from datetime import date
+
+import assumptions
+import company_store
+import memory
+import metrics
+import permalink
+from company_index import CompanyIndex, display_name
+from decumulation import DEFAULT_PATHS, TARGET_SUCCESS, simulate_growth, solve_withdrawal_rate
+from export import EXPORT_MIME, export_file, schedule_rows
+from contributions import ContributionRules, contribution_paths
+from projection import PAY_FREQUENCIES, PERIODS_PER_YEAR, PaySchedule, project_matrix
+from projection_cache import persistent_cache, tag
+from plans import read_plan_index
+from submissions import recent_inputs, record_submission
+import warmup
+
+logger = logging.getLogger(__name__)
 
 ACCENT = "#F97113"
 ACCENT_HOVER = "#E5620F"
@@ -13,12 +33,15 @@ TEXT = "#111827"
 INPUT_BG = "#F3F4F6"
 PLACEHOLDER = "rgba(17, 24, 39, 0.55)"
 
+SCRIPT_STARTED = time.perf_counter()
+
 st.set_page_config(
     page_title="Bison Wealth 401(k) Growth Simulator",
     page_icon="🦬",
     layout="wide",
     initial_sidebar_state="collapsed"
 )
+warmup.session_started(st.session_state)
 
 st.markdown(
     f"""
@@ -215,18 +238,25 @@ st.markdown(
 def _b64_file(path: Path) -> str:
     return base64.b64encode(path.read_bytes()).decode("utf-8")
 
-def inject_brand_fonts():
+@st.cache_resource(show_spinner=False)
+def load_brand_fonts():
     font_dir = Path(__file__).resolve().parent / "Fonts"
 
     body_font_path = font_dir / "Urbanist-VariableFont_wght.ttf"
     headline_font_path = font_dir / "RethinkSans-VariableFont_wght.ttf"
 
     if not body_font_path.exists() or not headline_font_path.exists():
+        return None
+
+    return _b64_file(body_font_path), _b64_file(headline_font_path)
+
+def inject_brand_fonts():
+    fonts = load_brand_fonts()
+    if fonts is None:
         st.warning("Font files not found in ./Fonts. Check folder name and filenames.")
         return
 
-    body_b64 = _b64_file(body_font_path)
-    headline_b64 = _b64_file(headline_font_path)
+    body_b64, headline_b64 = fonts
 
     st.markdown(
         f"""
@@ -301,28 +331,29 @@ def create_supabase_client():
 
 supabase: Client | None = create_supabase_client()
 
-@st.cache_data(show_spinner=False)
-def load_company_names():
-    data_path = Path(__file__).resolve().parent / "401k Data.csv"
-    if not data_path.exists():
-        return []
-
-    df = pd.read_csv(data_path)
-    df.columns = df.columns.str.strip()
-
-    if "Company Name" not in df.columns:
-        return []
-
-    return sorted(
-        set(
-            df["Company Name"]
-            .dropna()
-            .astype(str)
-            .str.strip()
-            .loc[lambda s: s != ""]
-            .str.title()
-        )
-    )
+COMPANY_DATA_PATH = Path(__file__).resolve().parent / "401k Data.csv"
+
+@st.cache_resource(show_spinner=False)
+def parse_company_data():
+    # Fallback when no company store has been built: this process parses the
+    # CSV and keeps its own copy.
+    plans = read_plan_index(COMPANY_DATA_PATH)
+    return plans, CompanyIndex(plans.names)
+
+def load_company_data():
+    # Prefer the mapped store, shared zero-copy by every process on the host
+    # and swapped in when `python company_store.py` rebuilds it. Only search
+    # results reach the browser.
+    store = company_store.current()
+    if store is not None:
+        return store.plans, store.companies
+    return parse_company_data()
+
+def load_plan_index():
+    return load_company_data()[0]
+
+def load_company_index():
+    return load_company_data()[1]
 
 def parse_number(x):
     try:
@@ -330,119 +361,296 @@ def parse_number(x):
     except Exception:
         return None
 
-@st.cache_data(show_spinner=False)
-def compute_projection(age, salary, balance):
-    end_age = 66
-    periods_per_year = 24
+DEFAULT_AGE = 41
+DEFAULT_SALARY = 84000
+DEFAULT_BALANCE = 76500
+WARMUP_RECENT_INPUTS = 20
 
-    if age >= end_age or salary <= 0:
-        return pd.DataFrame({
-            "age": [age],
-            "baseline": [balance],
-            "with_help": [balance]
-        })
+END_AGE = 66
+CONTRIBUTION_RULES = ContributionRules(employee_rate=0.078, employer_rate=0.046)
 
-    years = end_age - age
+PLAN_TO_AGE = 95
+WITHDRAWAL_INFLATION = 0.025
+RETURN_VOLATILITY = 0.12
 
-    salary_growth_rate = 0.03
-    contribution_rate = 0.078 + 0.046
-    r_no_help = 0.0819
-    r_help = r_no_help + 0.0332
+SCENARIO_NAMES = ("Without Bison", "With Bison")
 
-    salaries = [salary * ((1 + salary_growth_rate) ** yr) for yr in range(years)]
-    annual_contribs = [s * contribution_rate for s in salaries]
+def scenario_returns(params, fund_return=None):
+    # Without help earns the plan's fund lineup return when we know it.
+    base = params.without_help_return if fund_return is None else fund_return
+    return (base, base + params.uplift)
 
-    def project(start, contribs, annual_rate):
-        total = start
-        out = [total]
+def plan_inputs(company, params):
+    # The selected company's plan terms where the data has them, else the defaults.
+    terms = load_plan_index().get(company) if company and company != NOT_LISTED else None
+    if terms is None:
+        return None, CONTRIBUTION_RULES, scenario_returns(params)
+    return terms, terms.contribution_rules(CONTRIBUTION_RULES), scenario_returns(params, terms.fund_return)
 
-        per_rate = (1 + annual_rate) ** (1 / periods_per_year) - 1
-        annual_factor = (1 + per_rate) ** periods_per_year
-        contrib_multiplier = (annual_factor - 1) / per_rate
+def projection_tags(age, salary, balance, start_year, pay_periods, returns, salary_growth, rules):
+    return [tag("return", r) for r in returns] + [tag("salary_growth", salary_growth)]
 
-        for yearly in contribs:
-            per_contrib = yearly / periods_per_year
-            total = total * annual_factor + per_contrib * contrib_multiplier
-            out.append(total)
+@st.cache_data(show_spinner=False)
+@persistent_cache("compute_projection", depends=(END_AGE,), tags=projection_tags)
+def compute_projection(age, salary, balance, start_year, pay_periods, returns, salary_growth, rules):
+    # Rows are (baseline, with_help); column t is the balance at age + t.
+    if age >= END_AGE or salary <= 0:
+        return np.full((len(returns), 1), float(balance))
 
-        return out
+    years = END_AGE - age
 
-    return pd.DataFrame({
-        "age": list(range(age, end_age + 1)),
-        "baseline": project(balance, annual_contribs, r_no_help),
-        "with_help": project(balance, annual_contribs, r_help),
-    })
-    
-st.session_state.setdefault("age_used", 41)
-st.session_state.setdefault("salary_used", 84000)
-st.session_state.setdefault("balance_used", 76500)
+    _, employee, employer = contribution_paths(age, salary, years, salary_growth, rules, start_year)
 
-left, right = st.columns([1, 2])
+    pay_schedule = PaySchedule(pay_periods=pay_periods, compounding_periods=pay_periods)
+    return project_matrix(balance, employee + employer, returns, pay_schedule)
 
-company = None
+@st.cache_data(show_spinner=False)
+def compute_retirement_income(retirement_balances, retire_age, returns):
+    years = PLAN_TO_AGE - retire_age
+    if years <= 0:
+        return [0.0 for _ in retirement_balances]
+
+    income = []
+    for balance, annual_return in zip(retirement_balances, returns):
+        growth = simulate_growth(annual_return, RETURN_VOLATILITY, years)
+        rate, _ = solve_withdrawal_rate(WITHDRAWAL_INFLATION, growth)
+        income.append(balance * rate)
+    return income
+
+def scenario_projection(*args):
+    # compute_projection, unless a permalink opened from the cache already
+    # holds the result for these arguments.
+    opened = st.session_state.get("permalink_projection")
+    if opened is not None:
+        key, values = opened
+        if key == compute_projection.key(*args):
+            return values
+        del st.session_state["permalink_projection"]
+    return compute_projection(*args)
+
+def export_schedule(age, salary, balance, start_year, pay_periods, returns, salary_growth, rules, fmt):
+    years = max(END_AGE - age, 0) if salary > 0 else 0
+    return export_file(
+        lambda: schedule_rows(
+            age,
+            salary,
+            balance,
+            years,
+            salary_growth,
+            rules,
+            dict(zip(SCENARIO_NAMES, returns)),
+            start_year,
+            PaySchedule(pay_periods=pay_periods, compounding_periods=pay_periods),
+        ),
+        fmt,
+    )
 
-with left:
-    st.subheader("Your Information")
+def warm_scenario(age, salary, balance):
+    # Same calls, with the same argument types, as the page makes for this input.
+    params = assumptions.current()
+    returns = scenario_returns(params)
+    values = compute_projection(
+        age, salary, balance, date.today().year, PERIODS_PER_YEAR, returns, params.salary_growth_rate, CONTRIBUTION_RULES
+    )
+    compute_retirement_income(
+        (float(values[0, -1]), float(values[1, -1])),
+        int(age) + values.shape[1] - 1,
+        returns,
+    )
+
+def warm_recent_scenarios():
+    for age, salary, balance in recent_inputs(supabase, WARMUP_RECENT_INPUTS):
+        if age < 65 and salary > 0:
+            warm_scenario(age, salary, balance)
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    return warmup.start([
+        ("brand_fonts", load_brand_fonts),
+        ("company_index", load_company_index),
+        ("default_scenario", lambda: warm_scenario(DEFAULT_AGE, DEFAULT_SALARY, DEFAULT_BALANCE)),
+        ("recent_scenarios", warm_recent_scenarios),
+    ])
 
-    age_input = st.number_input("Age", 18, 100, 41)
-    salary_input = parse_number(st.text_input("Current Annual Salary ($)", "84,000"))
-    balance_input = parse_number(st.text_input("Current 401(k) Balance ($)", "76,500"))
+start_warmup()
+
+st.session_state.setdefault("age_used", DEFAULT_AGE)
+st.session_state.setdefault("salary_used", DEFAULT_SALARY)
+st.session_state.setdefault("balance_used", DEFAULT_BALANCE)
+st.session_state.setdefault("pay_periods_used", PERIODS_PER_YEAR)
+
+DEFAULT_CALENDLY = "https://powermy401k.com/contact-us/"
+ALT_CALENDLY = "https://calendly.com/placeholder-not-listed"
+NOT_LISTED = "My Company Is Not Listed"
 
-    company_list = load_company_names()
+COMPANY_MATCHES = 8
+COMPANY_MIN_CHARS = 2
+COMPANY_DEBOUNCE = "300ms"
 
-    company_input = st.selectbox(
+def open_permalink():
+    # A shared link restores the inputs without the form's checks and, when it
+    # still hashes to the key it carries, the chart from the stored projection.
+    token = st.query_params.get(permalink.SCENARIO_PARAM)
+    if not token or token == st.session_state.get("permalink_token"):
+        return
+    st.session_state.permalink_token = token
+
+    try:
+        scenario = permalink.decode(token)
+        age, salary, balance = scenario["age"], scenario["salary"], scenario["balance"]
+        pay_periods, company = scenario["pay_periods"], scenario["company"]
+        if not (
+            isinstance(age, int) and 18 <= age <= 100
+            and all(isinstance(v, (int, float)) and math.isfinite(v) for v in (salary, balance))
+            and pay_periods in PAY_FREQUENCIES.values()
+            and (company is None or isinstance(company, str))
+        ):
+            raise ValueError("Permalink inputs are out of range.")
+    # OverflowError: JSON integers too large for a float.
+    except (ValueError, TypeError, KeyError, OverflowError):
+        metrics.incr("permalink.invalid")
+        return
+
+    st.session_state.age_used = age
+    st.session_state.salary_used = salary
+    st.session_state.balance_used = balance
+    st.session_state.pay_periods_used = pay_periods
+    st.session_state.company_used = company
+    st.session_state.company_query = company if company and company != NOT_LISTED else ""
+
+    params = assumptions.current()
+    _, rules, returns = plan_inputs(company, params)
+    key = compute_projection.key(age, salary, balance, date.today().year, pay_periods, returns, params.salary_growth_rate, rules)
+    values = permalink.cached(key, st.query_params.get(permalink.KEY_PARAM, ""))
+    if values is not None:
+        st.session_state.permalink_projection = (key, values)
+
+open_permalink()
+
+def use_company_match():
+    st.session_state.company_query = st.session_state.company_match
+
+@st.fragment
+def company_picker():
+    # Typing reruns only this fragment, after a pause, and sends the browser
+    # the top matches instead of the whole company list.
+    index = load_company_index()
+    query = st.text_input(
         "Company Name",
-        options=company_list,
-        index=None,
+        key="company_query",
         placeholder="Type your company's name",
-        accept_new_options=True
+        live=COMPANY_DEBOUNCE,
     )
 
-    if company_input and len(company_input.strip()) >= 3:
-        normalized = company_input.strip().title()
-        company = normalized if normalized in company_list else "My Company Is Not Listed"
-
-    calculate = st.button("Calculate", type="primary")
-
-if calculate:
-    if salary_input is None or salary_input <= 0:
-        st.error("Please enter a salary greater than $0 to run the projection.")
-    elif balance_input is None:
-        st.error("Please enter your current 401(k) balance.")
-    elif age_input >= 65:
-        st.error("Projection only supports ages under 65.")
-    elif not company:
-        st.error("Please select or enter a company name.")
-    else:
-        st.session_state.age_used = age_input
-        st.session_state.salary_used = salary_input
-        st.session_state.balance_used = balance_input
-
-        try:
-            if supabase:
-                supabase.table("submissions").insert({
-                    "age": age_input,
-                    "salary": salary_input,
-                    "balance": balance_input,
-                    "company": company,
-                    "created_at": datetime.utcnow().isoformat()
-                }).execute()
-        except Exception:
-            pass
-
-df = compute_projection(
-    st.session_state.age_used,
-    st.session_state.salary_used,
-    st.session_state.balance_used
-)
+    if not query or len(query.strip()) < COMPANY_MIN_CHARS:
+        return
 
-final_diff = df["with_help"].iloc[-1] - df["baseline"].iloc[-1]
+    with metrics.timed("company_search"):
+        matches = index.search(query, COMPANY_MATCHES)
+
+    if matches and query not in index:
+        st.selectbox(
+            "Matching companies",
+            matches,
+            index=None,
+            key="company_match",
+            placeholder=f"{len(matches)} matching companies",
+            on_change=use_company_match,
+            label_visibility="collapsed",
+        )
 
-DEFAULT_CALENDLY = "https://powermy401k.com/contact-us/"
-ALT_CALENDLY = "https://calendly.com/placeholder-not-listed"
-calendly_link = ALT_CALENDLY if company == "My Company Is Not Listed" else DEFAULT_CALENDLY
+def selected_company():
+    query = st.session_state.get("company_query") or ""
+    if len(query.strip()) < 3:
+        return None
+    normalized = display_name(query)
+    return normalized if normalized in load_company_index() else NOT_LISTED
+
+def input_panel():
+    # The widgets sit in a form, so editing them reruns nothing until Calculate.
+    # The company picker sits above it so it can search while the user types.
+    st.subheader("Your Information")
+    company_picker()
+
+    with st.form("inputs", border=False):
+
+        age_input = st.number_input("Age", 18, 100, int(st.session_state.age_used))
+        salary_input = parse_number(st.text_input("Current Annual Salary ($)", f"{st.session_state.salary_used:,.0f}"))
+        balance_input = parse_number(st.text_input("Current 401(k) Balance ($)", f"{st.session_state.balance_used:,.0f}"))
+        pay_frequency_input = st.selectbox(
+            "How Often You're Paid",
+            options=list(PAY_FREQUENCIES),
+            index=list(PAY_FREQUENCIES.values()).index(st.session_state.pay_periods_used),
+        )
+
+        calculate = st.form_submit_button("Calculate", type="primary")
+
+    company = selected_company()
+
+    if calculate:
+        if salary_input is None or salary_input <= 0:
+            st.error("Please enter a salary greater than $0 to run the projection.")
+        elif balance_input is None:
+            st.error("Please enter your current 401(k) balance.")
+        elif age_input >= 65:
+            st.error("Projection only supports ages under 65.")
+        elif not company:
+            st.error("Please select or enter a company name.")
+        else:
+            st.session_state.age_used = age_input
+            st.session_state.salary_used = salary_input
+            st.session_state.balance_used = balance_input
+            st.session_state.pay_periods_used = PAY_FREQUENCIES[pay_frequency_input]
+            st.session_state.company_used = company
+
+            record_submission(supabase, st.session_state, {
+                "age": age_input,
+                "salary": salary_input,
+                "balance": balance_input,
+                "company": company,
+            })
+
+    return company
+
+def share_scenario(projection_args):
+    # Keeps the address bar on the scenario shown, so the page can be
+    # reloaded or its URL shared without losing it.
+    age, salary, balance, _, pay_periods = projection_args[:5]
+    scenario = {
+        "age": age,
+        "salary": salary,
+        "balance": balance,
+        "pay_periods": pay_periods,
+        "company": st.session_state.get("company_used"),
+    }
+    query = permalink.params(scenario, compute_projection.key(*projection_args))
+    st.session_state.permalink_token = query[permalink.SCENARIO_PARAM]
+    if st.query_params.to_dict() != query:
+        st.query_params.from_dict(query)
+
+@st.fragment
+@metrics.timed("rerun.chart_panel")
+def chart_panel(company):
+    params = assumptions.current()
+    plan, rules, returns = plan_inputs(st.session_state.get("company_used"), params)
+
+    projection_args = (
+        st.session_state.age_used,
+        st.session_state.salary_used,
+        st.session_state.balance_used,
+        date.today().year,
+        st.session_state.pay_periods_used,
+        returns,
+        params.salary_growth_rate,
+        rules,
+    )
+    values = scenario_projection(*projection_args)
+    baseline, with_help = values
+    ages = np.arange(int(st.session_state.age_used), int(st.session_state.age_used) + values.shape[1])
+
+    final_diff = with_help[-1] - baseline[-1]
+    calendly_link = ALT_CALENDLY if company == NOT_LISTED else DEFAULT_CALENDLY
 
-with right:
     st.markdown(
         f"""
         <div style="text-align:center; font-size:26px; margin-top:6px; margin-bottom:10px;
@@ -456,29 +664,29 @@ with right:
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
-        x=df["age"],
-        y=df["baseline"],
+        x=ages,
+        y=baseline,
         mode="lines",
-        name="Average earnings without Bison (8.2%)",
+        name=f"Average earnings without Bison ({returns[0]:.1%})",
         line=dict(color=baseline_color, width=3),
         showlegend=False,
     ))
 
     fig.add_trace(go.Scatter(
-        x=df["age"],
-        y=df["with_help"],
+        x=ages,
+        y=with_help,
         mode="lines",
-        name="Average earnings with Bison Managed 401(k) (11.5%)",
+        name=f"Average earnings with Bison Managed 401(k) ({returns[1]:.1%})",
         line=dict(color=help_color, width=4),
         showlegend=False,
     ))
 
-    x_max = df["age"].iloc[-1]
-    x_min = df["age"].iloc[0]
-    x_padding = 1 if len(df) > 1 else 0.5
+    x_max = ages[-1]
+    x_min = ages[0]
+    x_padding = 1 if len(ages) > 1 else 0.5
 
-    final_baseline = df["baseline"].iloc[-1]
-    final_help = df["with_help"].iloc[-1]
+    final_baseline = baseline[-1]
+    final_help = with_help[-1]
 
     fig.add_trace(go.Scatter(
         x=[x_max],
@@ -558,6 +766,7 @@ with right:
     )
 
     st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+    warmup.chart_rendered(st.session_state)
 
     st.markdown(
         f"""
@@ -603,17 +812,70 @@ with right:
         <div class="bw-legend">
             <div class="bw-legend-item">
                 <span class="bw-swatch" style="background:{baseline_color};"></span>
-                Average earnings without Bison (8.2%)
+                Average earnings without Bison ({returns[0]:.1%})
             </div>
             <div class="bw-legend-item">
                 <span class="bw-swatch" style="background:{help_color};"></span>
-                Average earnings with Bison Managed 401(k) (11.5%)
+                Average earnings with Bison Managed 401(k) ({returns[1]:.1%})
             </div>
         </div>
         """,
         unsafe_allow_html=True
     )
 
+    income_baseline, income_help = compute_retirement_income(
+        (float(final_baseline), float(final_help)),
+        int(x_max),
+        returns,
+    )
+
+    if income_help > 0:
+        st.markdown(
+            f"""
+            <div style="text-align:center; font-size:16px; margin-bottom:14px;
+                        font-family:'Urbanist', sans-serif; color:{TEXT};">
+                Estimated retirement income to age {PLAN_TO_AGE}:
+                <b>${income_help:,.0f}/yr</b> with Bison vs ${income_baseline:,.0f}/yr without
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+    # Only the terms the projection actually took from the plan; fallbacks
+    # and unreadable match formulas are the footer's defaults, not plan data.
+    terms = []
+    if plan is not None and plan.employee_rate is not None:
+        terms.append(f"{rules.employee_rate:.1%} default deferral")
+    if rules.match_tiers:
+        terms.append(f"{plan.match_formula} match")
+    if plan is not None and plan.fund_return is not None:
+        terms.append(f"{plan.fund_return:.2%} fund lineup return")
+    if terms:
+        st.caption(f"Using {st.session_state.company_used}'s plan: {', '.join(terms)}.")
+
+    export_args = (
+        int(st.session_state.age_used),
+        float(st.session_state.salary_used),
+        float(st.session_state.balance_used),
+        date.today().year,
+        int(st.session_state.pay_periods_used),
+        returns,
+        params.salary_growth_rate,
+        rules,
+    )
+
+    csv_col, xlsx_col = st.columns(2)
+    for col, fmt in ((csv_col, "csv"), (xlsx_col, "xlsx")):
+        with col:
+            st.download_button(
+                f"Download year-by-year numbers ({fmt.upper()})",
+                data=lambda fmt=fmt: export_schedule(*export_args, fmt),
+                file_name=f"bison_401k_projection.{fmt}",
+                mime=EXPORT_MIME[fmt],
+                on_click="ignore",
+                use_container_width=True,
+            )
+
     st.markdown(
         f"""
         <div style="text-align:center; margin-top:26px;">
@@ -629,10 +891,61 @@ with right:
         unsafe_allow_html=True
     )
 
-st.space("large")
-st.space("large")
-st.caption(
-    "For illustrative purposes only. Assumes 3% annual salary growth and 12.4% annual contribution "
-    "(7.8% employee, 4.6% employer). Performance without help is the 5-year annualized return of the "
-    "S&P Target Date 2035 Index as of Dec 31, 2025. With help is increased by 3.32% based on the Hewitt Study."
-)
+    share_scenario(projection_args)
+
+def footer_caption(params, plan, rules, returns):
+    # Describes the terms the chart above was drawn with: the selected
+    # company's plan where the data has them, else the defaults.
+    if rules.match_tiers:
+        contributions = f"a {rules.employee_rate:.1%} employee contribution with the plan's {plan.match_formula} employer match"
+    else:
+        contributions = (
+            f"{rules.employee_rate + rules.employer_rate:.1%} annual contribution "
+            f"({rules.employee_rate:.1%} employee, {rules.employer_rate:.1%} employer)"
+        )
+    if plan is not None and plan.fund_return is not None:
+        performance = f"Performance without help is the plan's {returns[0]:.2%} fund lineup return. "
+    else:
+        performance = (
+            f"Performance without help is the {returns[0]:.2%} 5-year annualized return of the "
+            "S&P Target Date 2035 Index as of Dec 31, 2025. "
+        )
+    return (
+        f"For illustrative purposes only. Assumes {params.salary_growth_rate:.0%} annual salary growth and {contributions}"
+        + (", subject to IRS contribution and compensation limits. " if rules.apply_limits else ". ")
+        + performance
+        + f"With help is increased by {params.uplift:.2%} based on the Hewitt Study. "
+        f"Retirement income is the first-year, inflation-adjusted ({WITHDRAWAL_INFLATION:.1%}) withdrawal that lasts to "
+        f"age {PLAN_TO_AGE} in {TARGET_SUCCESS:.0%} of {DEFAULT_PATHS:,} simulated markets with {RETURN_VOLATILITY:.0%} volatility."
+    )
+
+# Page config, CSS, fonts and the Supabase client run once per page load;
+# Calculate reruns only this fragment, footer included.
+@st.fragment
+@metrics.timed("rerun.calculator")
+def calculator():
+    left, right = st.columns([1, 2])
+
+    with left:
+        company = input_panel()
+
+    with right:
+        chart_panel(company)
+
+    params = assumptions.current()
+    plan, rules, returns = plan_inputs(st.session_state.get("company_used"), params)
+    st.space("large")
+    st.space("large")
+    st.caption(footer_caption(params, plan, rules, returns))
+
+calculator()
+
+
+metrics.observe("rerun.app", time.perf_counter() - SCRIPT_STARTED)
+
+# Walking the company index isn't free, so only when someone is listening.
+if logger.isEnabledFor(logging.DEBUG):
+    logger.debug("Memory: %s", memory.report(st.session_state, {
+        "plan_index": load_plan_index(),
+        "company_index": load_company_index(),
+    }))
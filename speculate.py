@@ -0,0 +1,110 @@
+import itertools
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Speculation shares the CPU with real reruns, so it gets few threads and a
+# short queue; work past MAX_PENDING is dropped rather than queued.
+SPECULATIVE_WORKERS = int(os.environ.get("SPECULATIVE_WORKERS", 2))
+MAX_PENDING = int(os.environ.get("SPECULATIVE_MAX_PENDING", 16))
+# Finished keys remembered for hit accounting, across sessions; one pushed
+# out unclaimed counts as wasted too.
+TRACKED_KEYS = 512
+
+Task = Tuple[str, Callable[[], Any]]
+
+
+class Speculator:
+    # Runs likely next computations on a small thread pool. The tasks are
+    # cached functions, so running one just fills the caches; each owner
+    # (a session) has one current generation. Submitting a new one cancels
+    # whatever of the old has not started, and the old results nobody
+    # claimed count as wasted unless the new generation wants them too.
+
+    def __init__(self, workers: int = SPECULATIVE_WORKERS, max_pending: int = MAX_PENDING):
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="speculate")
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._generation_ids = itertools.count()
+        # owner -> (generation id, its futures, its keys)
+        self._generations: Dict[str, Tuple[int, List[Future], List[str]]] = {}
+        self._unclaimed: "OrderedDict[str, None]" = OrderedDict()
+
+    def submit(self, owner: str, tasks: Iterable[Task]) -> int:
+        tasks = list(tasks)
+        wanted = {key for key, _ in tasks}
+        generation = next(self._generation_ids)
+        wasted = 0
+
+        with self._lock:
+            _, old_jobs, old_keys = self._generations.pop(owner, (None, (), ()))
+            for job in old_jobs:
+                if job.cancel():
+                    self._pending -= 1
+                    metrics.incr("speculative.cancelled")
+            for key in old_keys:
+                if key in self._unclaimed and key not in wanted:
+                    del self._unclaimed[key]
+                    wasted += 1
+
+            jobs, keys = [], []
+            for key, task in tasks:
+                keys.append(key)
+                if key in self._unclaimed:
+                    continue
+                if self._pending >= self._max_pending:
+                    metrics.incr("speculative.dropped")
+                    continue
+                self._pending += 1
+                jobs.append(self._executor.submit(self._run, owner, generation, key, task))
+            self._generations[owner] = (generation, jobs, keys)
+
+        metrics.incr("speculative.wasted", wasted)
+        metrics.incr("speculative.submitted", len(jobs))
+        return len(jobs)
+
+    def _run(self, owner: str, generation: int, key: str, task: Callable[[], Any]) -> None:
+        with self._lock:
+            self._pending -= 1
+        try:
+            with metrics.timed("speculative.task"):
+                task()
+        except Exception:
+            metrics.incr("speculative.failed")
+            logger.exception("Speculative task failed")
+            return
+
+        with self._lock:
+            current = self._generations.get(owner)
+            if current is None or current[0] != generation:
+                # Finished after its generation was superseded.
+                metrics.incr("speculative.wasted")
+                return
+            self._unclaimed[key] = None
+            self._unclaimed.move_to_end(key)
+            while len(self._unclaimed) > TRACKED_KEYS:
+                self._unclaimed.popitem(last=False)
+                metrics.incr("speculative.wasted")
+
+    def claim(self, key: str) -> bool:
+        # Called once per Calculate with what it actually needed; True when
+        # speculation computed it first.
+        with self._lock:
+            hit = key in self._unclaimed
+            if hit:
+                del self._unclaimed[key]
+        metrics.incr("speculative.used" if hit else "speculative.missed")
+        return hit
+
+    def stats(self) -> Dict[str, int]:
+        # Unclaimed results are not wasted yet, but will be if nobody asks.
+        with self._lock:
+            return {"pending": self._pending, "unclaimed": len(self._unclaimed)}
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, MutableMapping, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Per-session token bucket: a burst of BUCKET_CAPACITY writes, then one every
+# BUCKET_REFILL_SECONDS.
+BUCKET_CAPACITY = 3
+BUCKET_REFILL_SECONDS = 60.0
+
+# Requires a unique constraint on (session_id, input_hash) in the submissions table.
+UPSERT_CONFLICT_COLUMNS = "session_id,input_hash"
+
+# How far back recent_inputs looks when ranking input combinations.
+RECENT_WINDOW_ROWS = 1000
+
+
+def input_hash(age: int, salary: float, balance: float, company: str) -> str:
+    canonical = json.dumps(
+        {
+            "age": int(age),
+            "salary": round(float(salary), 2),
+            "balance": round(float(balance), 2),
+            "company": company.strip().lower(),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def session_id(state: MutableMapping[str, Any]) -> str:
+    if "submission_session_id" not in state:
+        state["submission_session_id"] = uuid.uuid4().hex
+    return state["submission_session_id"]
+
+
+def take_token(state: MutableMapping[str, Any], now: Optional[float] = None) -> bool:
+    now = time.monotonic() if now is None else now
+    tokens, last = state.get("submission_bucket", (float(BUCKET_CAPACITY), now))
+    tokens = min(BUCKET_CAPACITY, tokens + (now - last) / BUCKET_REFILL_SECONDS)
+
+    if tokens < 1.0:
+        state["submission_bucket"] = (tokens, now)
+        return False
+
+    state["submission_bucket"] = (tokens - 1.0, now)
+    return True
+
+
+def record_submission(client, state: MutableMapping[str, Any], row: Dict[str, Any]) -> str:
+    metrics.incr("submissions.attempted")
+
+    sid = session_id(state)
+    key = input_hash(row["age"], row["salary"], row["balance"], row["company"])
+    written = state.setdefault("submission_hashes", set())
+
+    if key in written:
+        outcome = "deduplicated"
+    elif client is None:
+        outcome = "skipped"
+    elif not take_token(state):
+        outcome = "rate_limited"
+    else:
+        try:
+            client.table("submissions").upsert(
+                {
+                    **row,
+                    "session_id": sid,
+                    "input_hash": key,
+                    "created_at": datetime.utcnow().isoformat(),
+                },
+                on_conflict=UPSERT_CONFLICT_COLUMNS,
+            ).execute()
+            written.add(key)
+            outcome = "written"
+        except Exception:
+            outcome = "failed"
+
+    metrics.incr(f"submissions.{outcome}")
+    logger.info(
+        "submission %s; counters=%s write_ratio=%.2f",
+        outcome,
+        metrics.snapshot("submissions."),
+        metrics.ratio("submissions.written", "submissions.attempted"),
+    )
+    return outcome
+
+
+def recent_inputs(client, top: int = 20, window: int = RECENT_WINDOW_ROWS) -> List[Tuple[int, float, float]]:
+    # Most common (age, salary, balance) combinations among the latest submissions.
+    if client is None:
+        return []
+
+    try:
+        rows = (
+            client.table("submissions")
+            .select("age,salary,balance")
+            .order("created_at", desc=True)
+            .limit(window)
+            .execute()
+            .data
+        )
+    except Exception:
+        logger.exception("Could not read recent submissions")
+        return []
+
+    counts = Counter()
+    for row in rows or []:
+        try:
+            counts[(int(row["age"]), float(row["salary"]), float(row["balance"]))] += 1
+        except (KeyError, TypeError, ValueError):
+            continue
+    return [combo for combo, _ in counts.most_common(top)]
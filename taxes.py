@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from contributions import LIMIT_INDEXING_RATE
+
+BRACKETS_PATH = Path(__file__).resolve().parent / "Data" / "tax_brackets.csv"
+
+# Federal ordinary income brackets are inflation-indexed like the plan
+# limits; later years scale the table year's thresholds at the same rate.
+BRACKET_INDEXING_RATE = LIMIT_INDEXING_RATE
+
+
+@dataclass(frozen=True)
+class Brackets:
+    year: int
+    deduction: float
+    floors: np.ndarray
+    rates: np.ndarray
+    # Tax owed on income up to each floor, so a lookup is one searchsorted.
+    base_tax: np.ndarray
+
+
+@lru_cache(maxsize=1)
+def load_brackets(path: Path = BRACKETS_PATH) -> Dict[str, Brackets]:
+    df = pd.read_csv(path).sort_values("Taxable Income Over", kind="stable")
+    out = {}
+    for status, rows in df.groupby("Filing Status", sort=False):
+        floors = rows["Taxable Income Over"].to_numpy(dtype=float)
+        rates = rows["Rate"].to_numpy(dtype=float) / 100.0
+        base_tax = np.concatenate(([0.0], np.cumsum(np.diff(floors) * rates[:-1])))
+        out[status] = Brackets(
+            year=int(rows["Year"].iloc[0]),
+            deduction=float(rows["Standard Deduction"].iloc[0]),
+            floors=floors,
+            rates=rates,
+            base_tax=base_tax,
+        )
+    return out
+
+
+FILING_STATUSES = tuple(load_brackets())
+
+
+def _lookup(income, calendar_years, status: str):
+    # Deflates income to the table year, so every cell uses the same floors.
+    brackets = load_brackets()[status]
+    scale = (1.0 + BRACKET_INDEXING_RATE) ** np.clip(np.asarray(calendar_years) - brackets.year, 0, None)
+    taxable = np.maximum(np.asarray(income, dtype=float) / scale - brackets.deduction, 0.0)
+    idx = np.searchsorted(brackets.floors, taxable, side="right") - 1
+    return brackets, taxable, idx, scale
+
+
+def income_tax(income, calendar_years, status: str) -> np.ndarray:
+    # Federal tax on ordinary income after the standard deduction. Inputs
+    # broadcast, like contribution_schedule.
+    brackets, taxable, idx, scale = _lookup(income, calendar_years, status)
+    return (brackets.base_tax[idx] + (taxable - brackets.floors[idx]) * brackets.rates[idx]) * scale
+
+
+def roth_contributions(wages, employee, calendar_years, status: str) -> np.ndarray:
+    # Roth deferrals that leave take-home pay where pre-tax ones would: the
+    # pre-tax deferral less the tax it actually saves, across however many
+    # brackets the deferral spans.
+    employee = np.asarray(employee, dtype=float)
+    saved = income_tax(wages, calendar_years, status) - income_tax(np.asarray(wages) - employee, calendar_years, status)
+    return employee - saved
+
+
+def after_tax_value(pretax, withdrawal_rate: float, calendar_years, status: str) -> np.ndarray:
+    # A pre-tax balance is worth what is left after tax on withdrawals; each
+    # dollar is taxed at the average rate on the first year's withdrawal.
+    pretax = np.asarray(pretax, dtype=float)
+    income = pretax * withdrawal_rate
+    tax = income_tax(income, calendar_years, status)
+    average = np.divide(tax, income, out=np.zeros_like(income), where=income > 0.0)
+    return pretax * (1.0 - average)
@@ -0,0 +1,48 @@
+import numpy as np
+
+from census import project_census, project_census_tax
+from contributions import ContributionRules
+from taxes import after_tax_value
+
+AGES = np.array([30, 45, 60], dtype=np.int16)
+SALARIES = np.array([50_000.0, 90_000.0, 140_000.0])
+BALANCES = np.array([10_000.0, 150_000.0, 600_000.0])
+RETIREMENT_AGES = np.array([67, 65, 62], dtype=np.int16)
+RETURNS = (0.05, 0.08)
+
+
+def project(rules, **kwargs):
+    args = (AGES, SALARIES, BALANCES, RETIREMENT_AGES, 0.03, rules, RETURNS, 2026)
+    return project_census(*args), project_census_tax(*args, 0.04, "Single", **kwargs)
+
+
+def test_pretax_row_is_the_taxed_projection():
+    finals, taxed = project(ContributionRules(0.078, 0.046))
+    assert taxed.shape == (2, len(RETURNS), len(AGES))
+    years = 2026 + np.clip(RETIREMENT_AGES + 1 - AGES, 0, None)
+    np.testing.assert_allclose(taxed[0], after_tax_value(finals, 0.04, years[None, :], "Single"))
+
+
+def test_without_employee_deferrals_both_rows_match():
+    _, taxed = project(ContributionRules(0.0, 0.046))
+    np.testing.assert_allclose(taxed[0], taxed[1])
+
+
+def test_roth_wins_when_retirement_is_taxed_more_than_work():
+    # Low wages, so Roth deferrals are all but untaxed, and large
+    # withdrawals taxed at a higher average rate later.
+    age, retirement_age = np.array([40], dtype=np.int16), np.array([65], dtype=np.int16)
+    taxed = project_census_tax(
+        age, np.array([20_000.0]), np.array([3_000_000.0]), retirement_age,
+        0.0, ContributionRules(0.1), RETURNS, 2026, 0.04, "Single",
+    )
+    assert (taxed[1] > taxed[0]).all()
+
+
+def test_empty_census():
+    empty = np.array([], dtype=np.int16)
+    taxed = project_census_tax(
+        empty, empty.astype(float), empty.astype(float), empty,
+        0.03, ContributionRules(0.078), RETURNS, 2026, 0.04, "Single",
+    )
+    assert taxed.shape == (2, len(RETURNS), 0)
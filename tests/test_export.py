@@ -0,0 +1,39 @@
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+from census import census_header, census_rows
+from contributions import ContributionRules
+from export import SCHEDULE_HEADER, export_file, schedule_rows
+
+
+def schedule():
+    return schedule_rows(42, 84_000.0, 76_500.0, 3, 0.03, ContributionRules(0.078, 0.046), {"Core": 0.07}, 2026)
+
+
+def as_download(data):
+    # What st.download_button does with a deferred callable's result.
+    return convert_data_to_bytes_and_infer_mime(data, TypeError("Callable returned unsupported type"))[0]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "xlsx"])
+def test_schedule_download_is_accepted(fmt):
+    data = as_download(export_file(schedule, fmt))
+    if fmt == "csv":
+        rows = list(csv.reader(io.StringIO(data.decode("utf-8"))))
+    else:
+        rows = [list(r) for r in load_workbook(io.BytesIO(data)).active.iter_rows(values_only=True)]
+    assert tuple(rows[0]) == SCHEDULE_HEADER
+    assert len(rows) == 4
+
+
+def test_census_download_is_accepted():
+    census = pd.DataFrame({"age": [30, 50], "salary": [50_000.0, 90_000.0], "balance": [0.0, 1.0], "retirement_age": [65, 65]})
+    finals = np.array([[1.0, 2.0]])
+    data = as_download(export_file(lambda: census_rows(census, finals), "csv", census_header(["Core"])))
+    assert data.decode("utf-8").splitlines()[0].startswith("Row,Age")
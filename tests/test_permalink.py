@@ -0,0 +1,81 @@
+import base64
+import json
+import threading
+import zlib
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import metrics
+import permalink
+import projection_cache
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SCENARIO = {"age": 42, "salary": 84_000.0, "balance": 76_500.0, "cfg": {"target_age": 67}}
+
+
+def token(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(zlib.compress(raw, 9)).rstrip(b"=").decode("ascii")
+
+
+NESTED = token(b"[" * 16_000)
+HUGE = permalink.encode({**SCENARIO, "salary": 10**400, "pay_periods": 26, "company": None})
+NAN = token(b'[1,{"age":42,"salary":84000,"balance":76500,"cfg":{"inflation_rate_pct":NaN}}]')
+
+
+def test_round_trip():
+    assert permalink.decode(permalink.encode(SCENARIO)) == SCENARIO
+
+
+def test_params_carry_the_key():
+    query = permalink.params(SCENARIO, "abc")
+    assert query[permalink.KEY_PARAM] == "abc"
+    assert permalink.decode(query[permalink.SCENARIO_PARAM]) == SCENARIO
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        "garbage",
+        "",
+        "!!!",
+        token(b"not json"),
+        token(b"[2,{}]"),
+        token(b"[1,[]]"),
+        token(b"1"),
+        "A" * (permalink.MAX_TOKEN_CHARS + 1),
+        token(b"[1," + b" " * (permalink.MAX_SCENARIO_BYTES + 1) + b"{}]"),
+        NESTED,
+    ],
+)
+def test_garbage_is_a_value_error(bad):
+    with pytest.raises(ValueError):
+        permalink.decode(bad)
+
+
+def test_nested_token_is_short():
+    # The crafted link fits comfortably in a URL.
+    assert len(NESTED) < 100
+
+
+def test_huge_numbers_decode_for_the_apps_to_reject():
+    assert permalink.decode(HUGE)["salary"] == 10**400
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(projection_cache, "CACHE_PATH", tmp_path / "cache.sqlite")
+    monkeypatch.setattr(projection_cache, "_local", threading.local())
+
+
+@pytest.mark.parametrize("app", ["Internal_Calc.py", "retirement_calculator.py"])
+@pytest.mark.parametrize("bad", [NESTED, HUGE, NAN], ids=["nested", "huge", "nan"])
+def test_apps_ignore_bad_links(cache, app, bad):
+    at = AppTest.from_file(str(ROOT / app), default_timeout=120)
+    at.query_params[permalink.SCENARIO_PARAM] = bad
+    invalid = metrics.get("permalink.invalid")
+    at.run()
+    assert not at.exception
+    assert metrics.get("permalink.invalid") == invalid + 1
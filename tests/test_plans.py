@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from plans import _to_rate, read_plan_index
+
+
+@pytest.mark.parametrize(
+    "text, rate",
+    [
+        ("1", 0.01),
+        ("1.0", 0.01),
+        ("1%", 0.01),
+        ("1.5", 0.015),
+        ("6", 0.06),
+        ("6%", 0.06),
+        ("0.06", 0.06),
+        ("0.5%", 0.005),
+        ("0.5", 0.5),
+    ],
+)
+def test_to_rate(text, rate):
+    assert _to_rate(pd.Series([text]))[0] == pytest.approx(rate)
+
+
+def test_to_rate_blank_is_unknown():
+    assert np.isnan(_to_rate(pd.Series([None, ""]))).all()
+
+
+def test_read_plan_index_matches_headers_loosely(tmp_path):
+    path = tmp_path / "plans.csv"
+    path.write_text("Company Name,Default Deferral Rate,Fund-Lineup Return\nAcme Inc,1,7.5%\n")
+    terms = read_plan_index(path).get("Acme Inc")
+    assert terms.employee_rate == pytest.approx(0.01)
+    assert terms.fund_return == pytest.approx(0.075)
@@ -0,0 +1,93 @@
+import importlib.util
+import threading
+import time
+
+import pytest
+
+import projection_cache
+
+MODULE = '''
+from projection_cache import persistent_cache
+
+RATE = 0.05
+
+
+def helper(x):
+    return x * {factor}
+
+
+@persistent_cache("f", depends=(RATE, helper))
+def f(x):
+    return helper(x) + {offset}
+'''
+
+
+def load(tmp_path, name, **fields):
+    path = tmp_path / f"{name}.py"
+    path.write_text(MODULE.format(**fields))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_key_is_stable_for_the_same_source(tmp_path):
+    a = load(tmp_path, "a", factor=2, offset=1)
+    b = load(tmp_path, "b", factor=2, offset=1)
+    assert a.f.key(3) == b.f.key(3)
+
+
+def test_editing_the_function_changes_its_key(tmp_path):
+    before = load(tmp_path, "before", factor=2, offset=1)
+    after = load(tmp_path, "after", factor=2, offset=2)
+    assert before.f.key(3) != after.f.key(3)
+
+
+def test_editing_a_helper_it_depends_on_changes_its_key(tmp_path):
+    before = load(tmp_path, "before", factor=2, offset=1)
+    after = load(tmp_path, "after", factor=3, offset=1)
+    assert before.f.key(3) != after.f.key(3)
+
+
+def test_key_follows_the_engine_version(tmp_path, monkeypatch):
+    before = load(tmp_path, "before", factor=2, offset=1)
+    monkeypatch.setattr(projection_cache, "ENGINE_VERSION", "other")
+    after = load(tmp_path, "after", factor=2, offset=1)
+    assert before.f.key(3) != after.f.key(3)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(projection_cache, "CACHE_PATH", tmp_path / "cache.sqlite")
+    monkeypatch.setattr(projection_cache, "_local", threading.local())
+    monkeypatch.setattr(projection_cache, "_pending_stats", {})
+    monkeypatch.setattr(projection_cache, "_pending_events", 0)
+    monkeypatch.setattr(projection_cache, "_last_flush", time.monotonic())
+    return projection_cache
+
+
+def test_hits_do_not_write(cache):
+    cache.put("k", "f", [1, 2, 3])
+    conn = cache._connect()
+    writes = conn.total_changes
+    for _ in range(cache.STATS_FLUSH_EVENTS - 1):
+        assert cache.get("k", "f") == [1, 2, 3]
+    assert conn.total_changes == writes
+
+
+def test_stats_are_flushed_in_batches(cache):
+    cache.put("k", "f", 1)
+    for _ in range(3):
+        cache.get("k", "f")
+    cache.get("missing", "f")
+    assert cache.stats()["f"] == {"hits": 3, "misses": 1, "hit_ratio": 0.75}
+
+
+def test_puts_stay_near_the_size_limit(cache, monkeypatch):
+    blob = b"x" * 1000
+    monkeypatch.setattr(cache, "MAX_BYTES", 20 * len(blob))
+    for i in range(200):
+        cache.put(f"k{i}", "f", blob)
+    size = cache.stats()["_store"]["bytes"]
+    assert size <= cache.MAX_BYTES + cache.EVICT_CHECK_EVERY * 1100
+    assert cache.get("k199", "f") == blob
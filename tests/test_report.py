@@ -0,0 +1,75 @@
+import importlib.util
+from concurrent.futures import Future
+
+import pytest
+
+import projection_cache
+import report
+
+MODULE = '''
+def draw(fig):
+    fig.add_trace({trace})
+'''
+
+
+@pytest.fixture(autouse=True)
+def fresh_versions():
+    report.report_version.cache_clear()
+    yield
+    report.report_version.cache_clear()
+
+
+def load(tmp_path, name, trace):
+    path = tmp_path / f"{name}.py"
+    path.write_text(MODULE.format(trace=trace))
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_key_is_stable_for_the_same_code(tmp_path):
+    a = load(tmp_path, "a", "line")
+    b = load(tmp_path, "b", "line")
+    assert report.report_key("pdf", (1, 2), report.report_version(a.draw)) == report.report_key(
+        "pdf", (1, 2), report.report_version(b.draw)
+    )
+
+
+def test_editing_the_figure_code_changes_the_key(tmp_path):
+    before = load(tmp_path, "before", "line")
+    after = load(tmp_path, "after", "bar")
+    assert report.report_version(before.draw) != report.report_version(after.draw)
+
+
+def test_key_follows_the_schema(monkeypatch):
+    before = report.report_version()
+    report.report_version.cache_clear()
+    monkeypatch.setattr(report, "REPORT_SCHEMA", report.REPORT_SCHEMA + 1)
+    assert report.report_version() != before
+
+
+def test_key_follows_the_engine_version(monkeypatch):
+    before = report.report_version()
+    report.report_version.cache_clear()
+    monkeypatch.setattr(projection_cache, "ENGINE_VERSION", "other")
+    assert report.report_version() != before
+
+
+def test_key_covers_format_and_inputs():
+    version = report.report_version()
+    keys = {report.report_key(fmt, inputs, version) for fmt in ("pdf", "png") for inputs in ((1, 2), (1, 3))}
+    assert len(keys) == 4
+
+
+def test_failed_jobs_report_their_cause():
+    pool = report.ReportPool(workers=1)
+    try:
+        failed = Future()
+        failed.set_exception(RuntimeError("\nKaleido requires Google Chrome,\nwhich was not found.\n"))
+        pool._jobs["k"] = failed
+        assert pool.status("k") == "failed"
+        assert pool.error("k") == "Kaleido requires Google Chrome, which was not found."
+        assert pool.error("missing") is None
+    finally:
+        pool._executor.shutdown()
@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+import metrics
+from speculate import Speculator
+
+
+@pytest.fixture
+def speculator():
+    speculator = Speculator(workers=1)
+    yield speculator
+    speculator._executor.shutdown(wait=True)
+
+
+def settle(speculator):
+    # One worker runs jobs in order, so a no-op queued last finishes last.
+    speculator._executor.submit(lambda: None).result()
+
+
+def delta(name, before):
+    return metrics.get(name) - before
+
+
+def test_claim_counts_used_and_missed(speculator):
+    used, missed = metrics.get("speculative.used"), metrics.get("speculative.missed")
+    speculator.submit("s", [("a", lambda: None)])
+    settle(speculator)
+
+    assert speculator.claim("a")
+    assert not speculator.claim("a")
+    assert delta("speculative.used", used) == 1
+    assert delta("speculative.missed", missed) == 1
+
+
+def test_superseded_unclaimed_results_are_wasted(speculator):
+    wasted = metrics.get("speculative.wasted")
+    speculator.submit("s", [("a", lambda: None), ("b", lambda: None)])
+    settle(speculator)
+    speculator.claim("a")
+
+    speculator.submit("s", [("c", lambda: None)])
+    settle(speculator)
+
+    assert delta("speculative.wasted", wasted) == 1
+    assert speculator.stats()["unclaimed"] == 1
+
+
+def test_results_wanted_again_carry_over(speculator):
+    submitted, wasted = metrics.get("speculative.submitted"), metrics.get("speculative.wasted")
+    speculator.submit("s", [("a", lambda: None)])
+    settle(speculator)
+
+    assert speculator.submit("s", [("a", lambda: None)]) == 0
+    assert delta("speculative.submitted", submitted) == 1
+    assert delta("speculative.wasted", wasted) == 0
+    assert speculator.claim("a")
+
+
+def test_results_finishing_after_a_new_generation_are_wasted(speculator):
+    wasted = metrics.get("speculative.wasted")
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    speculator.submit("s", [("a", slow)])
+    started.wait(5)
+    speculator.submit("s", [])
+    release.set()
+    settle(speculator)
+
+    assert delta("speculative.wasted", wasted) == 1
+    assert not speculator.claim("a")
+
+
+def test_sessions_do_not_supersede_each_other(speculator):
+    wasted = metrics.get("speculative.wasted")
+    speculator.submit("s", [("a", lambda: None)])
+    speculator.submit("t", [("b", lambda: None)])
+    settle(speculator)
+
+    assert delta("speculative.wasted", wasted) == 0
+    assert speculator.claim("a") and speculator.claim("b")
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from taxes import BRACKET_INDEXING_RATE, after_tax_value, income_tax, roth_contributions
+
+# Single, 2026: $16,100 deduction; 10% to $12,400, 12% to $50,400, then 22%.
+
+
+def test_income_below_the_deduction_is_untaxed():
+    assert income_tax(16_100, 2026, "Single") == 0.0
+
+
+def test_income_tax_steps_through_the_brackets():
+    # $53,900 taxable: 10% of 12,400 + 12% of 38,000 + 22% of 3,500.
+    assert income_tax(70_000, 2026, "Single") == pytest.approx(1_240 + 4_560 + 770)
+
+
+def test_brackets_are_indexed_in_later_years():
+    scale = (1.0 + BRACKET_INDEXING_RATE) ** 10
+    assert income_tax(70_000 * scale, 2036, "Single") == pytest.approx(income_tax(70_000, 2026, "Single") * scale)
+
+
+def test_income_tax_broadcasts():
+    tax = income_tax(np.array([[50_000.0], [90_000.0]]), np.array([2026, 2027, 2028]), "Married filing jointly")
+    assert tax.shape == (2, 3)
+    assert (tax[1] > tax[0]).all()
+
+
+def test_roth_contributions_across_a_bracket_boundary():
+    # $7,000 pre-tax saves $770 at 22% and $420 at 12%.
+    assert roth_contributions(70_000, 7_000, 2026, "Single") == pytest.approx(5_810)
+
+
+def test_roth_contributions_within_one_bracket():
+    assert roth_contributions(90_000, 5_000, 2026, "Single") == pytest.approx(5_000 * (1 - 0.22))
+
+
+def test_roth_contributions_keep_take_home_pay_equal():
+    wages, employee = np.array([30_000.0, 70_000.0, 250_000.0]), np.array([1_500.0, 7_000.0, 24_500.0])
+    roth = roth_contributions(wages, employee, 2026, "Single")
+    pretax_take_home = wages - employee - income_tax(wages - employee, 2026, "Single")
+    roth_take_home = wages - roth - income_tax(wages, 2026, "Single")
+    np.testing.assert_allclose(roth_take_home, pretax_take_home)
+
+
+def test_untaxed_wages_defer_the_same_roth():
+    np.testing.assert_allclose(roth_contributions([10_000.0, 5_000.0], [1_000.0, 0.0], 2026, "Single"), [1_000.0, 0.0])
+
+
+def test_after_tax_value_uses_the_average_rate_on_withdrawals():
+    # $40,000 a year: $23,900 taxable, $2,620 tax, 6.55% average.
+    assert after_tax_value(1_000_000, 0.04, 2026, "Single") == pytest.approx(1_000_000 * (1 - 2_620 / 40_000))
+
+
+def test_after_tax_value_of_small_and_empty_balances():
+    np.testing.assert_allclose(after_tax_value([0.0, 100_000.0], 0.04, 2026, "Single"), [0.0, 100_000.0])
@@ -0,0 +1,62 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterable, MutableMapping, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Streamlit imports the app's modules on the first session, so this is the
+# closest thing the script sees to the server process starting.
+PROCESS_STARTED = time.monotonic()
+
+_first_chart_lock = threading.Lock()
+_first_chart_seen = False
+
+Task = Tuple[str, Callable[[], Any]]
+
+
+def start(tasks: Iterable[Task]) -> threading.Thread:
+    # Runs each task once on a daemon thread. Tasks are cached functions, so
+    # warming just means calling them; failures are logged and skipped.
+    tasks = list(tasks)
+
+    def run():
+        started = time.perf_counter()
+        for name, task in tasks:
+            try:
+                with metrics.timed(f"warmup.{name}"):
+                    task()
+            except Exception:
+                metrics.incr("warmup.failed")
+                logger.exception("Warm-up task %s failed", name)
+        metrics.incr("warmup.seconds", time.perf_counter() - started)
+        logger.info("Warm-up finished: %s", metrics.snapshot("warmup."))
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def session_started(state: MutableMapping[str, Any]) -> None:
+    state.setdefault("session_started", time.monotonic())
+
+
+def chart_rendered(state: MutableMapping[str, Any]) -> None:
+    # Time from the session's first run to its first chart, plus the same
+    # measured from process start for the first chart the process serves.
+    if state.get("chart_rendered"):
+        return
+    state["chart_rendered"] = True
+
+    now = time.monotonic()
+    metrics.incr("time_to_first_chart.calls")
+    metrics.incr("time_to_first_chart.seconds", now - state.get("session_started", now))
+
+    global _first_chart_seen
+    with _first_chart_lock:
+        first, _first_chart_seen = not _first_chart_seen, True
+    if first:
+        metrics.incr("startup.first_chart_seconds", now - PROCESS_STARTED)
+        logger.info("First chart %.3fs after process start", now - PROCESS_STARTED)